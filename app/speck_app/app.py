@@ -75,7 +75,7 @@ class SpeckApp:
             (curr_i, fore_i) = self.speck.forecast(loc)
 
         except speck.errors.InvalidLocation as e:
-            loc = self.speck.find_city(loc) # try to find our own
+            loc = self.speck.find_city(loc, 1) # try to find our own
 
             if len(loc) == 0:
                 raise speck.errors.InvalidLocation('Unknown location.', e.internal_code)
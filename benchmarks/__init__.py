@@ -0,0 +1,44 @@
+"""
+Offline benchmarks for speck.
+These don't make any requests to weatherapi.com, recorded responses in ``fixtures`` are used instead.
+
+Run a benchmark with ``python -m benchmarks.<name>`` from the repository root.
+"""
+
+import json
+import os
+import time
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+def fixture(name):
+    """Load the recorded response for an endpoint."""
+
+    with open(os.path.join(FIXTURES, f'{name}.json'), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def timeit(func, number=None, seconds=0.2):
+    """
+    Time a function call.
+
+    :param number: Number of calls. Picked so that the benchmark takes about ``seconds`` if not given.
+    :returns: Average seconds per call.
+    """
+
+    if number is None:
+        number = 1
+        while True:
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            elapsed = time.perf_counter() - start
+
+            if elapsed >= seconds / 10:
+                number = max(1, int(number * seconds / elapsed))
+                break
+            number *= 10
+
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    return (time.perf_counter() - start) / number
@@ -0,0 +1,63 @@
+"""
+Compare compression codecs on pickled `types` payloads.
+
+Usage: ``python -m benchmarks.compression``
+"""
+
+from speck import client, compression, serializers
+
+from . import fixture, timeit
+
+def codecs():
+    """Available codecs, at a few levels each."""
+
+    yield compression.NoCodec()
+
+    for level in (1, 6, 9):
+        yield compression.ZlibCodec(level)
+
+    yield compression.LzmaCodec(0)
+    yield compression.LzmaCodec(6)
+
+    for (cls, levels) in ((compression.ZstdCodec, (1, 3, 9)), (compression.Lz4Codec, (0, 9))):
+        for level in levels:
+            try:
+                yield cls(level)
+            except ImportError:
+                break
+
+def run():
+    serializer = serializers.PickleSerializer()
+    payloads = {
+        'current': serializer.dumps(client._parse_current(fixture('current'))),
+        'forecast': serializer.dumps(client._parse_forecast(fixture('forecast')))
+    }
+
+    results = []
+
+    for (payload, blob) in payloads.items():
+        for codec in codecs():
+            stored = codec.encode(blob)
+
+            results.append({
+                'payload': payload,
+                'codec': repr(codec),
+                'bytes': len(stored),
+                'ratio': len(blob) / len(stored),
+                'compress_us': timeit(lambda: codec.encode(blob)) * 1e6,
+                'decompress_us': timeit(lambda: compression.decode(stored)) * 1e6
+            })
+
+    return results
+
+def main():
+    print(f'{"payload":<10}{"codec":<24}{"bytes":>9}{"ratio":>8}{"compress us":>14}{"decompress us":>16}')
+
+    for i in run():
+        print(
+            f'{i["payload"]:<10}{i["codec"]:<24}{i["bytes"]:>9}{i["ratio"]:>8.2f}'
+            f'{i["compress_us"]:>14.1f}{i["decompress_us"]:>16.1f}'
+        )
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Compare cache serializers on real `types` payloads.
+
+Usage: ``python -m benchmarks.serializers``
+"""
+
+import zlib
+
+from speck import client, serializers
+
+from . import fixture, timeit
+
+def payloads():
+    """Cached forms of the current and forecast responses."""
+
+    current = fixture('current')
+    forecast = fixture('forecast')
+
+    return {
+        'current': (current, client._parse_current(current)),
+        'forecast': (forecast, client._parse_forecast(forecast))
+    }
+
+def cases():
+    """``(name, serializer, parse)``. ``parse`` converts loaded raw responses into `types` objects."""
+
+    yield ('pickle', serializers.PickleSerializer(), False)
+    yield ('packed', serializers.PackedSerializer(), False)
+    yield ('json (raw response)', serializers.JsonSerializer(), True)
+
+    try:
+        yield ('msgpack (raw response)', serializers.MsgpackSerializer(), True)
+    except ImportError:
+        pass
+
+def run():
+    parsers = {'current': client._parse_current, 'forecast': client._parse_forecast}
+    results = []
+
+    for (payload, (raw, parsed)) in payloads().items():
+        parse = parsers[payload]
+
+        for (name, serializer, is_raw) in cases():
+            data = raw if is_raw else parsed
+
+            for compress in (False, True):
+                blob = serializer.dumps(data)
+
+                if compress:
+                    dumps = lambda: zlib.compress(serializer.dumps(data))
+                    stored = zlib.compress(blob)
+                    loads = lambda: serializer.loads(zlib.decompress(stored))
+                else:
+                    dumps = lambda: serializer.dumps(data)
+                    stored = blob
+                    loads = lambda: serializer.loads(stored)
+
+                # A hit isn't done until the client has `types` objects
+                read = (lambda: parse(loads())) if is_raw else loads
+
+                results.append({
+                    'payload': payload,
+                    'serializer': name,
+                    'compress': compress,
+                    'bytes': len(stored),
+                    'dumps_us': timeit(dumps) * 1e6,
+                    'loads_us': timeit(read) * 1e6
+                })
+
+    return results
+
+def main():
+    print(f'{"payload":<10}{"serializer":<24}{"zlib":<7}{"bytes":>9}{"dumps us":>12}{"loads us":>12}')
+
+    for i in run():
+        print(
+            f'{i["payload"]:<10}{i["serializer"]:<24}{"yes" if i["compress"] else "no":<7}'
+            f'{i["bytes"]:>9}{i["dumps_us"]:>12.1f}{i["loads_us"]:>12.1f}'
+        )
+
+if __name__ == '__main__':
+    main()
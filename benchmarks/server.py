@@ -0,0 +1,140 @@
+"""
+Local stand-in for the weatherapi.com API.
+Replays recorded responses from ``fixtures``, with configurable latency and errors.
+
+Run it on its own with ``python -m benchmarks.server [port]``.
+"""
+
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from . import FIXTURES
+
+__all__ = ['ReplayServer']
+
+# Errors returned in place of a response, like weatherapi does.
+_INVALID_LOCATION = (400, {'error': {'code': 1006, 'message': 'No matching location found.'}})
+_INTERNAL_ERROR = (400, {'error': {'code': 9999, 'message': 'Internal application error.'}})
+_QUOTA_EXCEEDED = (403, {'error': {'code': 2007, 'message': 'API key has exceeded calls per month quota.'}})
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1' # Keep-alive
+    disable_nagle_algorithm = True # Headers and body are written separately
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.server.replay.handle(self)
+
+class ReplayServer:
+    """
+    Serves recorded weatherapi responses on ``127.0.0.1``. Endpoints are answered with the
+    fixture of the same name, whatever the query. Locations starting with ``invalid`` get
+    a weatherapi "no matching location" error.
+
+    :param port: Port to listen on. A free port is picked by default.
+    :param latency: Seconds to wait before answering every request.
+    :param jitter: Up to this many more seconds are added to ``latency``, at random.
+    :param error_rate: Fraction of requests answered with an error.
+    :param error_kind: Which error is injected. ``'api'`` answers with a weatherapi internal error,
+        ``'quota'`` with a weatherapi quota exceeded error, ``'http'`` with an HTTP 500 without
+        a JSON body, and ``'reset'`` closes the connection without answering.
+    :param seed: Seed for the random latency and errors, so runs can be repeated.
+    :var url: Base URL to use as ``Client.BASE``.
+    :var requests: Number of requests received.
+    """
+
+    def __init__(self, port=0, latency=0.0, jitter=0.0, error_rate=0.0, error_kind='api', seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_kind = error_kind
+        self.requests = 0
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+        self._fixtures = {}
+        for i in os.listdir(FIXTURES):
+            if i.endswith('.json'):
+                with open(os.path.join(FIXTURES, i), 'rb') as f:
+                    self._fixtures[i[:-len('.json')]] = f.read()
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), _Handler)
+        self._server.daemon_threads = True
+        self._server.replay = self
+
+        self.url = f'http://127.0.0.1:{self._server.server_address[1]}/v1'
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def start(self):
+        """Start serving on a background thread."""
+
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def serve_forever(self):
+        """Serve on this thread until :meth:`stop` is called."""
+        self._server.serve_forever()
+
+    def stop(self):
+        """Stop serving."""
+
+        self._server.shutdown()
+        self._server.server_close()
+
+    def handle(self, request):
+        """Answer a request."""
+
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + self._random.random() * self.jitter
+            error = self._random.random() < self.error_rate
+
+        if delay:
+            time.sleep(delay)
+
+        url = urlparse(request.path)
+        endpoint = url.path.rsplit('/', 1)[-1][:-len('.json')]
+        query = parse_qs(url.query).get('q', [''])[0]
+
+        if error and self.error_kind == 'reset':
+            request.close_connection = True
+            return
+
+        if error and self.error_kind == 'http':
+            self.__send(request, 500, b'Internal Server Error', 'text/plain')
+        elif error and self.error_kind == 'quota':
+            self.__send(request, _QUOTA_EXCEEDED[0], json.dumps(_QUOTA_EXCEEDED[1]).encode())
+        elif error:
+            self.__send(request, _INTERNAL_ERROR[0], json.dumps(_INTERNAL_ERROR[1]).encode())
+        elif query.startswith('invalid') or endpoint not in self._fixtures:
+            self.__send(request, _INVALID_LOCATION[0], json.dumps(_INVALID_LOCATION[1]).encode())
+        else:
+            self.__send(request, 200, self._fixtures[endpoint])
+
+    @staticmethod
+    def __send(request, status, body, content_type='application/json'):
+        request.send_response(status)
+        request.send_header('Content-Type', content_type)
+        request.send_header('Content-Length', str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
+
+if __name__ == '__main__':
+    server = ReplayServer(port=int(sys.argv[1]) if len(sys.argv) > 1 else 0)
+    print(f'Serving recorded responses at {server.url}')
+    server.serve_forever()
@@ -0,0 +1,356 @@
+"""
+Client benchmark suite. Measures throughput, latency, cache hit paths and parse costs
+against a :class:`server.ReplayServer`, and writes the results as JSON so that they can
+be compared between releases.
+
+Usage: ``python -m benchmarks [--output results.json] [--quick]``
+"""
+
+import argparse
+import json
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from datetime import datetime as dt
+
+import speck
+
+from speck import cities
+from speck import client as speck_client
+from speck import decoding
+
+from . import compression, fixture, serializers, times, timeit
+from .server import ReplayServer
+
+# Endpoint -> (client method, arguments, parser, fixture)
+ENDPOINTS = {
+    'current': ('current', ('london',), speck_client._parse_current, 'current'),
+    'forecast': ('forecast', ('london', 3), speck_client._parse_forecast, 'forecast'),
+    'history': ('history', ('london', 7), speck_client._parse_forecast, 'history'),
+    'astronomy': ('astronomy', ('london',), speck_client._parse_astronomy, 'astronomy'),
+    'search': ('search', ('london',), speck_client._parse_search, 'search'),
+    'ip': ('ip_lookup', ('8.8.8.8',), speck_client._parse_ip, 'ip'),
+    'sports': ('sports_lookup', ('london',), speck_client._parse_sports, 'sports')
+}
+
+CACHES = ('memory', 'file', 'sqlite', 'mmap', 'tiered')
+
+def percentiles(samples):
+    """Summarize latency samples in seconds, as milliseconds."""
+
+    samples = sorted(samples)
+    pick = lambda p: samples[min(len(samples) - 1, int(p * len(samples)))]
+
+    return {
+        'count': len(samples),
+        'mean_ms': sum(samples) / len(samples) * 1e3,
+        'p50_ms': pick(0.5) * 1e3,
+        'p90_ms': pick(0.9) * 1e3,
+        'p99_ms': pick(0.99) * 1e3,
+        'max_ms': samples[-1] * 1e3
+    }
+
+def make_client(server, cache=None, path=None, **kwargs):
+    """A client making requests to ``server``, with the cache manager called ``cache``."""
+
+    if cache is None:
+        c = speck.Client('benchmark', **kwargs)
+    elif cache == 'memory':
+        c = speck.Client('benchmark', use_cache=True, **kwargs)
+    else:
+        c = speck.Client('benchmark', use_cache=True, cache_file=cache, cache_path=path, **kwargs)
+
+    c.BASE = server.url
+    return c
+
+# Benchmarks -----------------
+
+def bench_parse(quick):
+    """Time to convert each recorded response into `types` objects, eagerly and lazily."""
+
+    seconds = 0.05 if quick else 0.3
+
+    return {
+        name: {
+            'us': timeit(lambda: parse(raw), seconds=seconds) * 1e6,
+            'lazy_us': timeit(lambda: parse(raw, True), seconds=seconds) * 1e6
+        }
+        for (name, (_, _, parse, fixture_name)) in ENDPOINTS.items()
+        for raw in (fixture(fixture_name),)
+    }
+
+def bench_columns(quick):
+    """Time to get hourly temperatures of a forecast as columns, and from points one by one."""
+
+    seconds = 0.05 if quick else 0.3
+    raw = fixture('forecast')
+    days = speck_client._parse_forecast(raw)[1]
+
+    try:
+        speck.types.hour_columns(raw)
+    except ImportError: # numpy isn't installed
+        return None
+
+    return {
+        'raw_us': timeit(lambda: speck.types.hour_columns(raw), seconds=seconds) * 1e6,
+        'lazy_us': timeit(lambda: speck.types.hour_columns(speck_client._parse_forecast(raw, True)[1]),
+                          seconds=seconds) * 1e6,
+        'points_us': timeit(lambda: speck.types.hour_columns(days), seconds=seconds) * 1e6,
+        'loop_us': timeit(lambda: [i.temp_c.val for day in days for i in day.hour], seconds=seconds) * 1e6
+    }
+
+def bench_latency(server, quick):
+    """Latency of uncached requests to each endpoint, one at a time."""
+
+    count = 20 if quick else 200
+    c = make_client(server)
+    results = {}
+
+    for (name, (method, args, _, _)) in ENDPOINTS.items():
+        func = getattr(c, method)
+        func(*args) # Warm up the connection
+
+        samples = []
+        for _ in range(count):
+            start = time.perf_counter()
+            func(*args)
+            samples.append(time.perf_counter() - start)
+
+        results[name] = percentiles(samples)
+
+    c.session.close()
+    return results
+
+def bench_throughput(server, quick):
+    """Uncached requests per second made with ``current_many``, with a few worker counts."""
+
+    count = 100 if quick else 1000
+    results = {}
+
+    for workers in (1, 8, 32):
+        c = make_client(server, max_workers=workers)
+        locs = [f'city {i}' for i in range(count)]
+
+        start = time.perf_counter()
+        c.current_many(locs)
+        elapsed = time.perf_counter() - start
+
+        results[f'workers_{workers}'] = {
+            'requests': count,
+            'seconds': elapsed,
+            'requests_per_second': count / elapsed,
+            'connection_reuse_rate': c.connection_stats()['reuse_rate']
+        }
+
+        c.session.close()
+
+    return results
+
+def bench_cache_hits(server, quick):
+    """
+    Time to return a cached response, and size of the cache, for every cache manager.
+    ``raw`` caches raw responses instead of `types` objects.
+    """
+
+    seconds = 0.05 if quick else 0.3
+    results = {}
+
+    for cache in CACHES:
+        for raw in (False, True):
+            path = tempfile.mkdtemp(prefix='speck-bench-')
+
+            try:
+                c = make_client(server, cache, path, cache_raw=raw)
+                key = f'{cache}_raw' if raw else cache
+                results[key] = {}
+
+                for name in ('current', 'forecast'):
+                    (method, args, _, _) = ENDPOINTS[name]
+                    func = getattr(c, method)
+                    func(*args) # Cache it
+
+                    results[key][name] = {'us': timeit(lambda: func(*args), seconds=seconds) * 1e6}
+
+                if hasattr(c.cache, 'flush'):
+                    c.cache.flush()
+                results[key]['bytes_stored'] = c.cache.debug_size()
+
+                c.session.close()
+                if hasattr(c.cache, 'close'):
+                    c.cache.close()
+            finally:
+                shutil.rmtree(path, ignore_errors=True)
+
+    return results
+
+def bench_decode(quick):
+    """Time to decode each recorded response, with every JSON backend installed."""
+
+    seconds = 0.05 if quick else 0.3
+    results = {}
+
+    for name in ('json', 'orjson', 'ujson'):
+        try:
+            backend = decoding.get_backend(name)
+        except ImportError:
+            continue
+
+        results[name] = {}
+        for (endpoint, (_, _, _, fixture_name)) in ENDPOINTS.items():
+            body = json.dumps(fixture(fixture_name)).encode()
+            results[name][endpoint] = {'us': timeit(lambda: backend.loads(body), seconds=seconds) * 1e6}
+
+    return results
+
+def bench_find_city(quick):
+    """Time to find cities by name, with a linear scan and with :class:`cities.CityIndex`."""
+
+    seconds = 0.05 if quick else 0.3
+    syllables = ['lon', 'don', 'par', 'is', 'ber', 'lin', 'ma', 'drid', 'ro', 'me', 'os', 'lo', 'ville']
+    known = [
+        {'name': ' '.join(
+            ''.join(syllables[(i // 13 ** j + w) % len(syllables)] for j in range(1 + i % 3)).title()
+            for w in range(1 + i % 2)
+        ), 'lat': 0.0, 'lon': 0.0, 'country': ''}
+        for i in range(20000 if quick else 100000)
+    ]
+
+    start = time.perf_counter()
+    index = cities.CityIndex(known)
+    results = {'cities': len(known), 'build_s': time.perf_counter() - start}
+
+    for query in ('London', 'ndon', 'lo'):
+        results[query] = {
+            'scan_us': timeit(lambda: [i for i in known if query.lower() in i['name'].lower()], seconds=seconds) * 1e6,
+            'all_us': timeit(lambda: index.search(query), seconds=seconds) * 1e6,
+            'top_10_us': timeit(lambda: index.search(query, 10), seconds=seconds) * 1e6
+        }
+
+    results['autocomplete_us'] = timeit(lambda: index.autocomplete('Lon'), seconds=seconds) * 1e6
+
+    return results
+
+def bench_stream(server, quick):
+    """Peak memory and time until the first day is available, of history with and without streaming."""
+
+    count = 5 if quick else 50
+    c = make_client(server)
+    results = {}
+
+    def full():
+        for i in c.history('london', 7)[1]:
+            yield i
+
+    for (name, func) in (('full', full), ('stream', lambda: c.history_stream('london', 7))):
+        list(func()) # Warm up the connection
+
+        first = []
+        total = []
+        for _ in range(count):
+            start = time.perf_counter()
+            days = func()
+            next(days)
+            first.append(time.perf_counter() - start)
+            for _ in days:
+                pass
+            total.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        for _ in func(): # Days are dropped as soon as they are used
+            pass
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        results[name] = {
+            'first_day': percentiles(first),
+            'total': percentiles(total),
+            'peak_kb': peak / 1024
+        }
+
+    c.session.close()
+    return results
+
+def bench_errors(server, quick):
+    """Latency and error mix of requests made while the server injects errors."""
+
+    count = 50 if quick else 500
+    results = {}
+
+    for kind in ('api', 'http', 'reset'):
+        server.error_rate = 0.1
+        server.error_kind = kind
+
+        c = make_client(server)
+        samples = []
+        failures = {}
+
+        for _ in range(count):
+            start = time.perf_counter()
+            try:
+                c.current('london')
+            except speck.WeatherApiError as e:
+                failures[type(e).__name__] = failures.get(type(e).__name__, 0) + 1
+            samples.append(time.perf_counter() - start)
+
+        results[kind] = dict(percentiles(samples), errors=failures)
+        c.session.close()
+
+    server.error_rate = 0.0
+    return results
+
+# ----------------------------
+
+def run(quick=False, latency=0.0):
+    """Run the whole suite, and get the results."""
+
+    results = {
+        'meta': {
+            'speck': speck.__version__,
+            'python': sys.version.split()[0],
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'time': dt.now().isoformat(timespec='seconds'),
+            'quick': quick,
+            'server_latency': latency
+        },
+        'parse': bench_parse(quick),
+        'columns': bench_columns(quick),
+        'decode': bench_decode(quick),
+        'find_city': bench_find_city(quick)
+    }
+
+    with ReplayServer(latency=latency) as server:
+        results['latency'] = bench_latency(server, quick)
+        results['throughput'] = bench_throughput(server, quick)
+        results['cache_hits'] = bench_cache_hits(server, quick)
+        results['stream'] = bench_stream(server, quick)
+        results['errors'] = bench_errors(server, quick)
+
+    results['serializers'] = serializers.run()
+    results['compression'] = compression.run()
+    results['times'] = times.run()
+
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Run the speck benchmark suite offline.')
+    parser.add_argument('-o', '--output', help='Write results to this JSON file.')
+    parser.add_argument('--quick', action='store_true', help='Fewer iterations, for a quick check.')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds of latency added by the server.')
+
+    args = parser.parse_args(argv)
+    results = run(args.quick, args.latency)
+    text = json.dumps(results, indent=2)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Compare parsing weatherapi times with `strptime` and with `types`' own parser, per call and
+per parsed forecast.
+
+Usage: ``python -m benchmarks.times``
+"""
+
+from datetime import datetime as dt
+
+from speck import client
+from speck.types import data_point
+
+from . import fixture, timeit
+
+def _strptime(text):
+    return dt.strptime(text, "%Y-%m-%d %H:%M")
+
+def run():
+    forecast = fixture('forecast')
+    times = [forecast['location']['localtime'], forecast['current']['last_updated']] + [
+        i['time'] for day in forecast['forecast']['forecastday'] for i in day['hour']
+    ]
+
+    def cold():
+        data_point._parse_time.cache_clear()
+        for i in times:
+            data_point._parse_time(i)
+
+    results = {
+        'times_per_forecast': len(times),
+        'strptime_us': timeit(lambda: [_strptime(i) for i in times]) / len(times) * 1e6,
+        'fast_us': timeit(cold) / len(times) * 1e6,
+        'memoized_us': timeit(lambda: [data_point._parse_time(i) for i in times]) / len(times) * 1e6
+    }
+
+    # Whole forecasts, the way the client parses them
+    parse = data_point._parse_time
+    try:
+        data_point._parse_time = _strptime
+        results['forecast_strptime_us'] = timeit(lambda: client._parse_forecast(forecast)) * 1e6
+    finally:
+        data_point._parse_time = parse
+
+    results['forecast_fast_us'] = timeit(lambda: client._parse_forecast(forecast)) * 1e6
+    results['saving_per_forecast_us'] = results['forecast_strptime_us'] - results['forecast_fast_us']
+
+    return results
+
+def main():
+    for (name, value) in run().items():
+        print(f'{name:<26}{value:>10.2f}')
+
+if __name__ == '__main__':
+    main()
@@ -42,6 +42,24 @@ extras_require = {
     ],
     'tests': [
         'pytest'
+    ],
+    'msgpack': [
+        'msgpack'
+    ],
+    'zstd': [
+        'zstandard'
+    ],
+    'lz4': [
+        'lz4'
+    ],
+    'numpy': [
+        'numpy'
+    ],
+    'orjson': [
+        'orjson'
+    ],
+    'ujson': [
+        'ujson'
     ]
 }
 
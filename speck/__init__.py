@@ -6,4 +6,7 @@ __version__ = 'v0.3.14'
 
 from .cache import *
 from .client import *
+from .async_client import *
 from .errors import *
+from .hooks import *
+from .limiter import *
@@ -0,0 +1,182 @@
+"""
+Transport adapter for the client's ``requests.Session``.
+Keeps connections to weatherapi.com alive between requests, and keeps track of how often
+pooled connections are reused and where the time of each request goes.
+"""
+
+import socket
+import threading
+import time
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.connection import allowed_gai_family
+
+__all__ = [
+    'PooledAdapter'
+]
+
+class PooledAdapter(HTTPAdapter):
+    """
+    ``HTTPAdapter`` with tunable connection pooling and keep-alive.
+
+    :param pool_connections: Number of host connection pools to keep.
+    :param pool_maxsize: Maximum number of connections kept open per host.
+        This should be at least the number of threads making requests at once.
+    :param keep_alive: Reuse connections between requests. If ``False``, every
+        request is made on a new connection.
+    :param tcp_keepalive: Idle seconds before TCP keep-alive probes are sent on an
+        open connection, or ``None`` to use the system defaults.
+
+    Responses sent through this adapter have a ``timings`` attribute, a ``dict`` with the
+    seconds spent resolving the host (``dns``) and opening a connection (``connect``),
+    both ``0`` if a pooled connection was reused, and until the response headers
+    arrived (``ttfb``).
+    """
+
+    __attrs__ = HTTPAdapter.__attrs__ + ['keep_alive', 'tcp_keepalive']
+
+    def __init__(self, pool_connections=10, pool_maxsize=10, keep_alive=True, tcp_keepalive=None, **kwargs):
+        self.keep_alive = keep_alive
+        self.tcp_keepalive = tcp_keepalive
+
+        self.__reset_stats()
+
+        super().__init__(pool_connections=pool_connections, pool_maxsize=pool_maxsize, **kwargs)
+
+    def __setstate__(self, state):
+        self.__reset_stats()
+        super().__setstate__(state)
+
+    def __reset_stats(self):
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._connections = 0
+
+        # Timings of the request being sent on each thread. Connections are
+        # opened on the thread sending the request, so they can add to these.
+        self._local = threading.local()
+
+    def _add_timing(self, phase, seconds):
+        """Add to a timing of the request being sent on this thread."""
+
+        timings = getattr(self._local, 'timings', None)
+        if timings is not None:
+            timings[phase] += seconds
+
+    def __socket_options(self):
+        """Socket options for new connections."""
+
+        options = list(HTTPConnection.default_socket_options)
+
+        if self.tcp_keepalive is not None:
+            options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+
+            # Not all platforms allow tuning these
+            if hasattr(socket, 'TCP_KEEPIDLE'):
+                options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, self.tcp_keepalive))
+            if hasattr(socket, 'TCP_KEEPINTVL'):
+                options.append((socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, self.tcp_keepalive))
+
+        return options
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs.setdefault('socket_options', self.__socket_options())
+        super().init_poolmanager(*args, **kwargs)
+
+        # Pools that make their connections through us, so we know when a socket is (re)opened.
+        # `urllib3` reconnects existing connection objects that were dropped by the server,
+        # so counting pool connections alone isn't enough.
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': self.__counting_pool(HTTPConnectionPool),
+            'https': self.__counting_pool(HTTPSConnectionPool)
+        }
+
+    def __counting_pool(self, pool_cls):
+        """Subclass ``pool_cls`` so that its connections report every ``connect`` to this adapter."""
+
+        adapter = self
+
+        class Connection(pool_cls.ConnectionCls):
+            def connect(self):
+                with adapter._lock:
+                    adapter._connections += 1
+
+                start = time.perf_counter()
+                self._dns_time = 0.0
+
+                try:
+                    super().connect()
+                finally:
+                    adapter._add_timing('connect', time.perf_counter() - start - self._dns_time)
+
+            def _new_conn(self):
+                # Resolve the host separately to time it, then let `urllib3` connect
+                # to each address in turn, as it would after resolving it itself.
+                host = self._dns_host
+                start = time.perf_counter()
+
+                try:
+                    addresses = list(dict.fromkeys(
+                        i[4][0] for i in socket.getaddrinfo(host, self.port, allowed_gai_family(), socket.SOCK_STREAM)
+                    ))
+                except (OSError, UnicodeError):
+                    addresses = [] # Let `urllib3` report the failure
+                finally:
+                    self._dns_time = time.perf_counter() - start
+                    adapter._add_timing('dns', self._dns_time)
+
+                if not addresses:
+                    return super()._new_conn()
+
+                try:
+                    for (i, address) in enumerate(addresses):
+                        self._dns_host = address
+                        try:
+                            return super()._new_conn()
+                        except Exception:
+                            if i == len(addresses) - 1:
+                                raise
+                finally:
+                    self._dns_host = host
+
+        return type(pool_cls.__name__, (pool_cls,), {'ConnectionCls': Connection})
+
+    def send(self, request, *args, **kwargs):
+        with self._lock:
+            self._requests += 1
+
+        timings = self._local.timings = {'dns': 0.0, 'connect': 0.0}
+        start = time.perf_counter()
+
+        try:
+            response = super().send(request, *args, **kwargs)
+        finally:
+            self._local.timings = None
+
+        timings['ttfb'] = time.perf_counter() - start
+        response.timings = timings
+
+        return response
+
+    def add_headers(self, request, **kwargs):
+        if not self.keep_alive:
+            request.headers['Connection'] = 'close'
+
+    def connection_stats(self):
+        """
+        Get connection reuse statistics, to help with sizing the pool.
+        ``reuse_rate`` is the fraction of requests that didn't need a new connection.
+
+        :rtype: ``dict{str: int | float}``
+        """
+
+        with self._lock:
+            requests, connections = self._requests, self._connections
+
+        return {
+            'requests': requests,
+            'connections': connections,
+            'reuse_rate': max(0.0, 1 - connections / requests) if requests else 0.0
+        }
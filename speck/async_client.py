@@ -0,0 +1,165 @@
+"""
+Asynchronous WeatherAPI client implementation.
+Use this to make concurrent requests to weatherapi.com from ``asyncio`` code.
+"""
+
+import asyncio
+import functools
+
+from concurrent.futures import ThreadPoolExecutor
+
+from .client import Client
+
+__all__ = ['AsyncClient']
+
+class AsyncClient:
+    """
+    Represents an asynchronous connection to weatherapi.com.
+    Every endpoint of :class:`Client` is available here as a coroutine,
+    returning the same `types` objects.
+
+    Requests are made by a wrapped :class:`Client` on a pool of worker threads,
+    so they share its ``requests.Session`` connection pool and cache manager.
+
+    :param concurrency: Maximum number of requests in flight at once.
+    :var client: The wrapped :class:`Client`. Requests are made with this.
+
+    Any other keyword argument, such as ``limiter`` or ``observers``, is passed on to :class:`Client`.
+    A blocking ``limiter`` waits on the worker threads, never on the event loop.
+    """
+
+    def __init__(self, token, use_cache=False, cache_file=False, cache_path='.cache', concurrency=16, **kwargs):
+        kwargs.setdefault('max_workers', concurrency)
+
+        self.client = Client(
+            token,
+            use_cache=use_cache,
+            cache_file=cache_file,
+            cache_path=cache_path,
+            **kwargs
+        )
+        self.concurrency = concurrency
+
+        self._executor = ThreadPoolExecutor(max_workers=concurrency)
+
+    @property
+    def cache(self):
+        """
+        The cache manager shared with the wrapped client.
+
+        :rtype: :class:`cache.CacheManager`
+        """
+        return self.client.cache
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Wait for pending requests, and release the worker threads, session and cache manager."""
+        self._executor.shutdown(wait=True)
+        self.client.session.close()
+        self.client.cache.close()
+
+    async def __run(self, func, *args, **kwargs):
+        """Run a blocking :class:`Client` method on the worker pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    # ----------------------------
+
+    def find_city(self, loc, k=None):
+        """See :meth:`Client.find_city`. This does not make any requests."""
+        return self.client.find_city(loc, k)
+
+    async def current(self, loc):
+        """
+        Get current weather conditions in a location.
+        See :meth:`Client.current`.
+
+        :rtype: :class:`types.HourlyPoint`
+        """
+        return await self.__run(self.client.current, loc)
+
+    async def forecast(self, loc, days=3):
+        """
+        Get weather forecast for a location.
+        See :meth:`Client.forecast`.
+
+        :rtype: ``(types.HourlyPoint, list[types.DailyPoint])``
+        """
+        return await self.__run(self.client.forecast, loc, days)
+
+    async def astronomy(self, loc):
+        """
+        Get astronomy information for a location.
+        See :meth:`Client.astronomy`.
+
+        :rtype: :class:`types.AstroPoint`
+        """
+        return await self.__run(self.client.astronomy, loc)
+
+    async def ip_lookup(self, ip):
+        """
+        Get information for an IP address.
+        See :meth:`Client.ip_lookup`.
+
+        :rtype: :class:`types.IpPoint`
+        """
+        return await self.__run(self.client.ip_lookup, ip)
+
+    async def search(self, loc):
+        """
+        Get a list of location objects based on query parameter.
+        See :meth:`Client.search`.
+
+        :rtype: ``list[types.Location]``
+        """
+        return await self.__run(self.client.search, loc)
+
+    async def timezone_info(self, loc):
+        """
+        Get timezone and associated information for a location.
+        See :meth:`Client.timezone_info`.
+
+        :rtype: :class:`types.Location`
+        """
+        return await self.__run(self.client.timezone_info, loc)
+
+    async def sports_lookup(self, loc):
+        """
+        Get listing of all upcoming sports events.
+        See :meth:`Client.sports_lookup`.
+
+        :rtype: ``dict{str: list[SportsPoint]}``
+        """
+        return await self.__run(self.client.sports_lookup, loc)
+
+    async def history(self, loc, days):
+        """
+        Get weather history for a location.
+        See :meth:`Client.history`.
+
+        :rtype: ``(types.HourlyPoint, list[types.DailyPoint])``
+        """
+        return await self.__run(self.client.history, loc, days)
+
+    # Aliases ---------------------------------------
+
+    async def astro(self, *args, **kwargs):
+        """Alias for ``astronomy``."""
+        return await self.astronomy(*args, **kwargs)
+
+    async def ip(self, *args, **kwargs):
+        """Alias for ``ip_lookup``."""
+        return await self.ip_lookup(*args, **kwargs)
+
+    async def tz(self, *args, **kwargs):
+        """Alias for ``timezone_info``."""
+        return await self.timezone_info(*args, **kwargs)
+
+    async def sports(self, *args, **kwargs):
+        """Alias for ``sports_lookup``."""
+        return await self.sports_lookup(*args, **kwargs)
@@ -4,57 +4,606 @@ The primary purpose of this is to reduce the number of required API calls.
 """
 
 import os
-import sys
+import re
+import mmap
+import time
+import queue
+import struct
+import sqlite3
+import threading
+import weakref
 
 import zlib
 import pickle
 
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from datetime import datetime as dt
+from datetime import timedelta as td
 from pathlib import Path
 
+from . import compression, serializers
+
+try:
+    import fcntl
+except ImportError: # Windows
+    fcntl = None
+    import msvcrt
+
 __all__ = [
+    'CacheStats',
     'CacheManager',
     'BufferedCacheManager',
-    'FileCacheManager'
+    'FileCacheManager',
+    'SqliteCacheManager',
+    'MmapCacheManager',
+    'TieredCacheManager'
 ]
 
+# Every cache entry is stored along with its expiry time, as ``(expires_at, blob)``.
+# ``expires_at`` is in seconds since the epoch, or ``None`` if the entry never expires.
+# ``blob`` is the serialized data, compressed with `compression`.
+
+def _expiry(ttl, expires_at):
+    """
+    Get the absolute expiry time of an entry.
+
+    :param ttl: Seconds (or a ``timedelta``) from now until expiry.
+    :param expires_at: Time of expiry as a ``datetime`` or seconds since the epoch.
+        Takes precedence over ``ttl``.
+    """
+
+    if expires_at is not None:
+        return expires_at.timestamp() if isinstance(expires_at, dt) else float(expires_at)
+
+    if ttl is not None:
+        return time.time() + (ttl.total_seconds() if isinstance(ttl, td) else ttl)
+
+    return None
+
+def _expired(expires_at):
+    """Check whether an entry with ``expires_at`` has expired."""
+    return expires_at is not None and expires_at <= time.time()
+
+def _pattern(pattern):
+    """Compile a cache name ``pattern``, where ``*`` matches any sequence of characters."""
+    return re.compile('.*'.join(re.escape(i) for i in pattern.split('*')), re.DOTALL)
+
+def _prefix(name):
+    """Type of cache with ``name``, i.e. everything before the first ``-``, like ``forecast``."""
+    return name.split('-', 1)[0]
+
+# Statistics ---------------
+
+class _Histogram:
+    """Latency histogram with fixed buckets."""
+
+    # Upper bounds of each bucket, in seconds. The last bucket has no upper bound.
+    BOUNDS = (1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 1e-2, 5e-2, 1e-1, 5e-1)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.total = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(self.BOUNDS, seconds)] += 1
+        self.total += seconds
+
+    def merge(self, other):
+        for (i, j) in enumerate(other.counts):
+            self.counts[i] += j
+        self.total += other.total
+
+    def snapshot(self):
+        count = sum(self.counts)
+
+        return {
+            'buckets': list(self.BOUNDS) + [float('inf')],
+            'counts': list(self.counts),
+            'count': count,
+            'sum': self.total,
+            'mean': self.total / count if count else 0.0
+        }
+
+class _PrefixStats:
+    """Statistics for one type of cache."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.evictions = 0
+        self.dumps = 0
+        self.write_errors = 0
+        self.bytes_stored = 0
+        self.read_latency = _Histogram()
+        self.dump_latency = _Histogram()
+
+    def reset(self):
+        bytes_stored = self.bytes_stored
+        self.__init__()
+        self.bytes_stored = bytes_stored
+
+    def merge(self, other):
+        self.hits += other.hits
+        self.misses += other.misses
+        self.stale += other.stale
+        self.evictions += other.evictions
+        self.dumps += other.dumps
+        self.write_errors += other.write_errors
+        self.bytes_stored += other.bytes_stored
+        self.read_latency.merge(other.read_latency)
+        self.dump_latency.merge(other.dump_latency)
+
+    def snapshot(self):
+        reads = self.hits + self.misses
+
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / reads if reads else 0.0,
+            'stale': self.stale,
+            'evictions': self.evictions,
+            'dumps': self.dumps,
+            'write_errors': self.write_errors,
+            'bytes_stored': self.bytes_stored,
+            'read_latency': self.read_latency.snapshot(),
+            'dump_latency': self.dump_latency.snapshot()
+        }
+
+class CacheStats:
+    """
+    Cache statistics, broken down by the type of cache (``current``, ``forecast``, ``astro``, ...).
+    Every cache manager keeps one of these as ``stats``. Safe to share across threads.
+
+    Every lookup is counted, as a hit if it found cache that hasn't expired and a miss otherwise.
+    Stale serves are outdated cache that was returned anyway, which is reported by the client.
+    Write errors are dumps that failed after the call dumping them returned, such as writes behind.
+    ``bytes_stored`` is the size of the cache as stored by the manager, it isn't reset by :meth:`reset`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._prefixes = {}
+
+    def __get(self, name):
+        """Statistics for the type of cache ``name`` is. Must be called with the lock held."""
+
+        prefix = _prefix(name)
+
+        stats = self._prefixes.get(prefix)
+        if stats is None:
+            stats = self._prefixes[prefix] = _PrefixStats()
+
+        return stats
+
+    def record_read(self, name, hit, seconds):
+        """Record a lookup of ``name`` that took ``seconds``."""
+
+        with self._lock:
+            stats = self.__get(name)
+
+            if hit:
+                stats.hits += 1
+            else:
+                stats.misses += 1
+            stats.read_latency.observe(seconds)
+
+    def record_dump(self, name, seconds):
+        """Record a dump of ``name`` that took ``seconds``."""
+
+        with self._lock:
+            stats = self.__get(name)
+            stats.dumps += 1
+            stats.dump_latency.observe(seconds)
+
+    def record_write_error(self, name):
+        """Record that writing cache with ``name`` failed."""
+
+        with self._lock:
+            self.__get(name).write_errors += 1
+
+    def record_stale(self, name):
+        """Record that outdated cache with ``name`` was served."""
+
+        with self._lock:
+            self.__get(name).stale += 1
+
+    def record_eviction(self, name):
+        """Record that cache with ``name`` was evicted."""
+
+        with self._lock:
+            self.__get(name).evictions += 1
+
+    def record_size(self, name, delta):
+        """Record that stored cache of ``name``'s type grew by ``delta`` bytes."""
+
+        with self._lock:
+            self.__get(name).bytes_stored += delta
+
+    def set_sizes(self, sizes):
+        """Replace the stored bytes of every type of cache with ``sizes``, a ``dict{prefix: bytes}``."""
+
+        with self._lock:
+            for stats in self._prefixes.values():
+                stats.bytes_stored = 0
+            for (prefix, size) in sizes.items():
+                self.__get(prefix).bytes_stored = size
+
+    @property
+    def bytes_stored(self):
+        """Total size of stored cache in bytes."""
+
+        with self._lock:
+            return sum(i.bytes_stored for i in self._prefixes.values())
+
+    def snapshot(self):
+        """
+        Get the current statistics. Latency histograms are in seconds,
+        with ``counts[i]`` reads or dumps taking at most ``buckets[i]``.
+
+        :returns: The totals, along with the same statistics for each type of cache in ``prefixes``.
+        :rtype: ``dict``
+        """
+
+        with self._lock:
+            total = _PrefixStats()
+            prefixes = {}
+
+            for (prefix, stats) in self._prefixes.items():
+                total.merge(stats)
+                prefixes[prefix] = stats.snapshot()
+
+        snapshot = total.snapshot()
+        snapshot['prefixes'] = prefixes
+
+        return snapshot
+
+    def reset(self):
+        """Reset all counters and histograms."""
+
+        with self._lock:
+            for stats in self._prefixes.values():
+                stats.reset()
+
 class CacheManager:
     """
     Abstract class representing a cache manager.
+
+    Implementations store entries in their stored form with :meth:`_write`, and load
+    them back with :meth:`_read`.
+
+    :param serializer: A :class:`serializers.Serializer` converting cache to bytes.
+        Defaults to :class:`serializers.PickleSerializer`.
+    :param compress: Compress serialized cache with ``zlib``. Shorthand for ``codec='zlib'``.
+    :param codec: A :class:`compression.Codec`, or its name, to compress serialized cache with.
+        Overrides ``compress``.
+    :param compress_threshold: Serialized cache smaller than this many bytes is stored uncompressed.
+    :var stats: :class:`CacheStats` of this manager.
     """
 
-    def __init__(self, path):
-        pass
+    # Errors decoding stored cache that make it count as missing instead,
+    # for managers whose cache can be damaged outside of their control.
+    _CORRUPT = ()
+
+    def __init__(self, path, serializer=None, compress=True, codec=None, compress_threshold=512):
+        self.stats = CacheStats()
+        self.serializer = serializer if serializer is not None else serializers.PickleSerializer()
+        self.codec = compression.get_codec(codec if codec is not None else ('zlib' if compress else 'none'))
+        self.compress_threshold = compress_threshold
+
+    @property
+    def compress(self):
+        """Whether serialized cache is compressed."""
+        return self.codec.id != compression.NoCodec.id
 
     def find_all(self):
         """Find all stored cache."""
         return None
 
     def read(self, name):
-        """Reads cache with ``name`` if it exists."""
+        """Reads cache with ``name`` if it exists and hasn't expired."""
+
+        entry = self.read_entry(name)
+
+        if entry is None or _expired(entry[0]):
+            return None
+
+        return entry[1]
+
+    def read_entry(self, name, record=True):
+        """
+        Reads cache with ``name`` if it exists, even if it has expired.
+
+        :param record: Count this lookup in ``stats``. Lookups repeating one that
+            was already counted shouldn't be.
+        :returns: ``(expires_at, data)``, or ``None``. ``expires_at`` is in seconds since
+            the epoch, or ``None`` if the cache never expires.
+        """
+
+        start = time.perf_counter()
+        entry = self._read(name)
+
+        if entry is not None:
+            try:
+                entry = (entry[0], self._decode(entry[1]))
+            except self._CORRUPT:
+                entry = None
+
+        if record:
+            self.stats.record_read(name, entry is not None and not _expired(entry[0]), time.perf_counter() - start)
+
+        return entry
+
+    def dump(self, name, data, ttl=None, expires_at=None):
+        """
+        Save data into cache.
+
+        :param ttl: Seconds (or a ``timedelta``) for which the cache is valid.
+        :param expires_at: Time at which the cache expires, as a ``datetime`` or seconds
+            since the epoch. Cache without ``ttl`` or ``expires_at`` never expires.
+        """
+
+        # Nothing is stored, so don't bother encoding it
+        if type(self)._write is CacheManager._write:
+            return
+
+        start = time.perf_counter()
+        self._write(name, _expiry(ttl, expires_at), self._encode(data))
+        self.stats.record_dump(name, time.perf_counter() - start)
+
+    def _read(self, name):
+        """
+        Reads cache with ``name`` in its stored form.
+
+        :returns: ``(expires_at, blob)``, or ``None`` if there is no such cache.
+        """
         return None
 
-    def dump(self, name, data):
-        """Save data into cache."""
+    def _write(self, name, expires_at, blob):
+        """
+        Store cache with ``name`` in its stored form.
+        Implementations keep ``stats`` up to date with the size of stored cache.
+
+        :param expires_at: Time of expiry in seconds since the epoch, or ``None``.
+        """
         return None
 
+    def _encode(self, data):
+        """Convert data into its stored form."""
+
+        return self.codec.encode(self.serializer.dumps(data), self.compress_threshold)
+
+    def _decode(self, blob):
+        """Convert stored data back into an object."""
+        return self.serializer.loads(compression.decode(blob))
+
     def cleanup(self, name):
         """Cleanup all cache with a ``name``"""
         return None
 
+    def close(self):
+        """Write anything pending and release the files held by this manager, if any."""
+        return None
+
     def debug_size(self):
-        """Get size of cache for debugging."""
-        return sys.getsizeof(self)
+        """
+        Get size of cache for debugging.
+
+        :returns: Size of stored cache in bytes.
+        """
+        return self.stats.bytes_stored
+
+
+# Key index ----------------
+
+class _KeyIndex:
+    """
+    Sorted index of cache names, so that wildcard lookups only visit names
+    starting with the pattern's literal prefix instead of every stored name.
+
+    Names are kept sorted in buckets of at most ``LOAD`` names, so adding or removing
+    one only shifts the names of a single bucket, in O(log n + LOAD).
+    """
+
+    LOAD = 512
+
+    def __init__(self, names=()):
+        self._set = set(names)
+
+        names = sorted(self._set)
+        self._buckets = [names[i:i + self.LOAD] for i in range(0, len(names), self.LOAD)]
+        self._maxes = [i[-1] for i in self._buckets] # Last name of each bucket
+
+    def __len__(self):
+        return len(self._set)
+
+    def __iter__(self):
+        for i in self._buckets:
+            yield from i
+
+    def add(self, name):
+        if name in self._set:
+            return
+
+        self._set.add(name)
+
+        if not self._buckets:
+            self._buckets.append([name])
+            self._maxes.append(name)
+            return
+
+        # Into the first bucket ending after it, or the last one
+        i = min(bisect_left(self._maxes, name), len(self._maxes) - 1)
+        bucket = self._buckets[i]
 
+        insort(bucket, name)
+        self._maxes[i] = bucket[-1]
+
+        if len(bucket) > 2 * self.LOAD:
+            self._buckets[i + 1:i + 1] = [bucket[self.LOAD:]]
+            del bucket[self.LOAD:]
+            self._maxes[i:i + 1] = [bucket[-1], self._buckets[i + 1][-1]]
+
+    def discard(self, name):
+        if name not in self._set:
+            return
+
+        self._set.remove(name)
+
+        i = bisect_left(self._maxes, name)
+        bucket = self._buckets[i]
+        del bucket[bisect_left(bucket, name)]
+
+        if bucket:
+            self._maxes[i] = bucket[-1]
+        else:
+            del self._buckets[i]
+            del self._maxes[i]
+
+    def __starting(self, prefix):
+        """Iterate over names in order, starting with the first one not before ``prefix``."""
+
+        i = bisect_left(self._maxes, prefix)
+        if i == len(self._buckets):
+            return
+
+        bucket = self._buckets[i]
+        yield from bucket[bisect_left(bucket, prefix):]
+
+        for bucket in self._buckets[i + 1:]:
+            yield from bucket
+
+    def match(self, pattern):
+        """
+        Find all names matching ``pattern``, where ``*`` matches any sequence of characters.
+
+        :rtype: ``list[str]``
+        """
+
+        els = pattern.split('*')
+        prefix = els[0]
+
+        if len(els) == 1: # Not a wildcard
+            return [prefix] if prefix in self._set else []
+
+        regex = _pattern(pattern)
+        found = []
+
+        # Everything starting with `prefix` is stored right after it
+        for name in self.__starting(prefix):
+            if not name.startswith(prefix):
+                break
+            if regex.fullmatch(name):
+                found.append(name)
+
+        return found
+
+# Eviction policies --------
+# Keep track of the order in which cache is to be evicted. All operations are O(1).
+
+class _LruPolicy:
+    """Evicts the least recently used cache first."""
+
+    def __init__(self):
+        self._order = OrderedDict() # Least recently used first
+
+    def add(self, name):
+        self._order[name] = None
+
+    def touch(self, name):
+        self._order.move_to_end(name)
+
+    def remove(self, name):
+        del self._order[name]
+
+    def victim(self):
+        return next(iter(self._order), None)
+
+class _LfuPolicy:
+    """Evicts the least frequently used cache first, and the least recently used out of those."""
+
+    def __init__(self):
+        self._freq = {}
+        self._buckets = {} # Use count -> names with that count, least recently used first
+        self._min = 0
+
+    def add(self, name):
+        self._freq[name] = 1
+        self._buckets.setdefault(1, OrderedDict())[name] = None
+        self._min = 1
+
+    def touch(self, name):
+        freq = self.__unlink(name)
+
+        self._freq[name] = freq + 1
+        self._buckets.setdefault(freq + 1, OrderedDict())[name] = None
+
+        if self._min not in self._buckets:
+            self._min = freq + 1
+
+    def remove(self, name):
+        self.__unlink(name)
+        del self._freq[name]
+
+    def victim(self):
+        if not self._buckets:
+            return None
+
+        # Only out of date after removals, which can't happen more often than additions.
+        if self._min not in self._buckets:
+            self._min = min(self._buckets)
+
+        return next(iter(self._buckets[self._min]))
+
+    def __unlink(self, name):
+        """Remove ``name`` from its use count bucket, and return its use count."""
+
+        freq = self._freq[name]
+        bucket = self._buckets[freq]
+
+        del bucket[name]
+        if not bucket:
+            del self._buckets[freq]
+
+        return freq
+
+_POLICIES = {
+    'lru': _LruPolicy,
+    'lfu': _LfuPolicy
+}
+
+# ---------------------------
 
 class BufferedCacheManager(CacheManager):
     """
     Buffered Cache Manager implementation. Stored cache in memory.
+
+    :param max_entries: Maximum number of cache entries kept, or ``None`` for no limit.
+    :param max_bytes: Maximum total size of stored (compressed) cache, or ``None`` for no limit.
+    :param policy: Which cache is evicted first when a limit is exceeded. Either
+        ``'lru'`` (least recently used) or ``'lfu'`` (least frequently used).
+    :var evictions: Number of cache entries evicted so far.
+
+    See :class:`CacheManager` for ``serializer``, ``compress``, ``codec`` and ``compress_threshold``.
     """
 
-    def __init__(self, path=None):
+    def __init__(
+        self, path=None, max_entries=None, max_bytes=None, policy='lru',
+        serializer=None, compress=True, codec=None, compress_threshold=512
+    ):
         self._buf = {}
+        self._size = 0 # Stored bytes
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.evictions = 0
+
+        self._policy = _POLICIES[policy]()
+        self._index = _KeyIndex()
+        self._lock = threading.Lock()
 
-        super().__init__(path)
+        super().__init__(path, serializer, compress, codec, compress_threshold)
 
     def find_all(self):
         """
@@ -62,73 +611,105 @@ class BufferedCacheManager(CacheManager):
 
         :rtype: :class:`generator`
         """
-        return (i for i in self._buf)
+        with self._lock:
+            return (i for i in list(self._buf))
 
-    def read(self, name):
-        """Reads cache with ``name`` if it exists."""
-        if name in self._buf:
-            return pickle.loads(zlib.decompress(self._buf[name]))
+    def _read(self, name):
+        with self._lock:
+            entry = self._buf.get(name)
+            if entry is not None:
+                self._policy.touch(name)
 
-        return None
+            return entry
+
+    def _write(self, name, expires_at, blob):
+        with self._lock:
+            self.__remove(name)
+
+            if self.max_bytes is not None and len(blob) > self.max_bytes:
+                return # Would never fit
+
+            # Make room before adding, so that the new entry isn't the one evicted
+            self.__evict(1, len(blob))
+
+            self._buf[name] = (expires_at, blob)
+            self._size += len(blob)
+            self._policy.add(name)
+            self._index.add(name)
+
+        self.stats.record_size(name, len(blob))
 
-    def dump(self, name, data):
-        """Save data into cache."""
-        self._buf[name] = zlib.compress(pickle.dumps(data))
+    def __evict(self, entries, size):
+        """Evict cache until ``entries`` more entries of ``size`` bytes fit. Must be called with the lock held."""
+
+        while self._buf and (
+            (self.max_entries is not None and len(self._buf) + entries > self.max_entries) or
+            (self.max_bytes is not None and self._size + size > self.max_bytes)
+        ):
+            victim = self._policy.victim()
+
+            self.__remove(victim)
+            self.evictions += 1
+            self.stats.record_eviction(victim)
+
+    def __remove(self, name):
+        """Remove cache with ``name``. Must be called with the lock held."""
+
+        entry = self._buf.pop(name, None)
+        if entry is not None:
+            self._size -= len(entry[1])
+            self._policy.remove(name)
+            self._index.discard(name)
+            self.stats.record_size(name, -len(entry[1]))
 
     def cleanup(self, name):
         """Cleanup all cache with a ``name``. Supports wildcard (*) deletion."""
 
-        els = name.split('*') # splits across *
-
-        print(els)
-
-        need_remove = []
-
-        for i in self._buf:
-            for n, j in enumerate(els):
-                if not (
-                    j == '' or (j in i and
-                        (i.index(j) >= i.index(els[0 if n < 1 else n - 1]))
-                        )
-                    ):
-                    break
-
-                    # Explanation for above check
-                    # ---------------------------
-                    # `els` is a list of all components split across *.
-                    # We check if each component of `else` is in
-                    # the cache name being checked (`j in i`).
-                    # If the component is empty, we can skip directly.
-                    # If it is, we make sure its after the previous
-                    # component (second check).
-            else:
-                need_remove.append(i)
-
-        for i in need_remove:
-            del self._buf[i]
+        with self._lock:
+            for i in self._index.match(name):
+                self.__remove(i)
 
     def debug_size(self):
         """
         Get size of internal cache for debugging.
 
-        :returns: Cache size in memory in bytes.
+        :returns: Size of stored cache in memory in bytes.
         """
-        return sys.getsizeof(self._buf)
+        with self._lock:
+            return self._size
 
 class FileCacheManager(CacheManager):
     """
     File based Cache Manager implementation. Keeps track of and gets/updates data from cache files.
 
+    Names of cache files are indexed when the manager is created, and kept up to date
+    as cache is dumped and cleaned up. Call :meth:`reindex` to pick up cache files
+    written by other processes.
+
+    Cache files are replaced whole, so they are never read while partly written.
+    Damaged cache files are treated as missing.
+
     :param path: Path to the "cache directory". Cache files will be stored here.
+
+    See :class:`CacheManager` for ``serializer``, ``compress``, ``codec`` and ``compress_threshold``.
     """
 
-    def __init__(self, path):
+    # Cache file layout: `_MAGIC`, expiry time (NaN if the cache never expires), then the data.
+    _MAGIC = b'SPECK1'
+    _EXPIRY = struct.Struct('<d')
+
+    _CORRUPT = (Exception,) # Anything could have happened to a file
+
+    def __init__(self, path, serializer=None, compress=True, codec=None, compress_threshold=512):
         self._path = path
 
-        super().__init__(path)
+        super().__init__(path, serializer, compress, codec, compress_threshold)
 
         Path(path).mkdir(parents=True, exist_ok=True)  # Creates cache folder
 
+        self._lock = threading.Lock()
+        self.reindex()
+
         # Cache is identified with its `name` attribute. Cache can be read by keeping track of this
         # value and reading it with `read` later on.
 
@@ -148,49 +729,870 @@ class FileCacheManager(CacheManager):
         :rtype: :class:`generator`
         """
         return (
-            ''.join(i.split('.')[:-1]) if i.endswith('.dat') else i
-            for i in os.listdir(self._path)
+            i[:-len('.dat')] if i.endswith('.dat') else i
+            for i in os.listdir(self._path) if not i.endswith('.tmp') # Being written
         )
 
-    def read(self, name):
+    def reindex(self):
+        """Rebuild the index of cache names, and their sizes, from the files in the cache directory."""
+
+        names = []
+        sizes = {}
+
+        with os.scandir(self._path) as files:
+            for i in files:
+                if i.name.endswith('.dat'):
+                    name = i.name[:-len('.dat')]
+                    names.append(name)
+
+                    prefix = _prefix(name)
+                    sizes[prefix] = sizes.get(prefix, 0) + i.stat().st_size
+
+        with self._lock:
+            self._index = _KeyIndex(names)
+            self.stats.set_sizes(sizes)
+
+    def __file_size(self, name):
+        """Size of the cache file for ``name``, or ``0`` if there is none."""
+
+        try:
+            return os.stat(f"{self._path}/{name}.dat").st_size
+        except FileNotFoundError:
+            return 0
+
+    def _read(self, name):
         """Tries to read cache with ``name``. Returns ``None`` if no such file is found."""
 
         try:
-            # Cache is stored as an object in a binary file,
-            # which can be loaded into an object directly later on.
             with open(f"{self._path}/{name}.dat", "rb") as f:
-                return pickle.loads(zlib.decompress(pickle.load(f)))
-
-        except pickle.PickleError:
-            pass
+                raw = f.read()
         except FileNotFoundError:
-            pass
+            return None
 
-        return None
+        if raw.startswith(self._MAGIC):
+            if len(raw) < len(self._MAGIC) + self._EXPIRY.size: # Damaged
+                return None
 
-    def dump(self, name, data):
+            (expires_at,) = self._EXPIRY.unpack_from(raw, len(self._MAGIC))
+            return (
+                None if expires_at != expires_at else expires_at, # NaN check
+                raw[len(self._MAGIC) + self._EXPIRY.size:]
+            )
+
+        # Older cache files are a pickled `(expires_at, blob)`,
+        # or only the blob if they were written before expiry was tracked.
+        try:
+            entry = pickle.loads(raw)
+        except Exception: # Damaged
+            return None
+
+        return (None, entry) if isinstance(entry, bytes) else entry
+
+    def _write(self, name, expires_at, blob):
         """Writes data to a cache file with ``name``. ``name`` must be kept track of manually."""
 
-        with open(f"{self._path}/{name}.dat", "wb") as f:
-            pickle.dump(zlib.compress(pickle.dumps(data)), f)
+        raw = self._MAGIC + self._EXPIRY.pack(float('nan') if expires_at is None else expires_at) + blob
+        replaced = self.__file_size(name)
+
+        # Written next to the cache file, then moved over it, which is atomic.
+        # Named after the writing thread, which is the only one using it.
+        tmp = f"{self._path}/{name}.{os.getpid()}-{threading.get_ident()}.tmp"
+
+        try:
+            with open(tmp, "wb") as f:
+                f.write(raw)
+
+            os.replace(tmp, f"{self._path}/{name}.dat")
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+        with self._lock:
+            self._index.add(name)
+
+        self.stats.record_size(name, len(raw) - replaced)
 
     def cleanup(self, name):
         """Cleans up all cache files with a given ``name``. Supports wildcard (*) deletion."""
 
-        els = name.split('*')
+        with self._lock:
+            found = self._index.match(name)
+            for i in found:
+                self._index.discard(i)
+
+        for i in found:
+            size = self.__file_size(i)
+
+            try:
+                os.remove(f"{self._path}/{i}.dat") # Delete the file
+            except FileNotFoundError:
+                continue
+
+            self.stats.record_size(i, -size)
+
+class SqliteCacheManager(CacheManager):
+    """
+    SQLite based Cache Manager implementation. Stores all cache in a single database,
+    which can be shared by many threads and processes.
+
+    Dumps are written in batches of ``batch_size``. Pending dumps are readable
+    by this manager right away, but only visible to other processes after the
+    batch is written, or :meth:`flush` is called. They are also written when
+    the manager is closed, garbage collected, or the interpreter exits.
+
+    :param path: Path to the "cache directory". The database is stored here as ``cache.db``.
+    :param batch_size: Number of dumps written together in one transaction.
+    :param timeout: Seconds to wait for other processes to release the database.
+
+    The stored size in ``stats`` is read from the database when it is opened, and only
+    follows changes made by this manager after that.
+
+    See :class:`CacheManager` for ``serializer``, ``compress``, ``codec`` and ``compress_threshold``.
+    """
+
+    def __init__(
+        self, path, batch_size=16, timeout=10,
+        serializer=None, compress=True, codec=None, compress_threshold=512
+    ):
+        self._path = path
+        self.batch_size = batch_size
+
+        super().__init__(path, serializer, compress, codec, compress_threshold)
+
+        Path(path).mkdir(parents=True, exist_ok=True)  # Creates cache folder
+
+        self._lock = threading.Lock()
+        self._pending = {}
+
+        # We do our own locking, so the connection can be used from any thread.
+        self._db = sqlite3.connect(
+            os.path.join(path, 'cache.db'),
+            timeout=timeout,
+            isolation_level=None, # Transactions are managed manually
+            check_same_thread=False
+        )
+
+        with self._lock:
+            # Write-ahead logging lets readers carry on while another process writes.
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('PRAGMA synchronous=NORMAL')
+
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS cache ('
+                'name TEXT PRIMARY KEY, expires_at REAL, data BLOB NOT NULL)'
+            )
+            self._db.execute('CREATE INDEX IF NOT EXISTS cache_expiry ON cache (expires_at)')
+
+            sizes = {}
+            for (name, size) in self._db.execute('SELECT name, length(data) FROM cache'):
+                prefix = _prefix(name)
+                sizes[prefix] = sizes.get(prefix, 0) + size
+
+            self.stats.set_sizes(sizes)
+
+        # Doesn't keep the manager alive, unlike registering `flush` with `atexit`.
+        self._finalizer = weakref.finalize(self, SqliteCacheManager.__close, self._db, self._pending, self._lock)
+
+    @property
+    def path(self):
+        """
+        Returns the directory in which the database is stored.
+
+        :rtype: :class:`str`
+        """
+        return self._path
+
+    def find_all(self):
+        """
+        Find all stored cache.
+
+        :rtype: :class:`generator`
+        """
+
+        self.flush()
+
+        with self._lock:
+            names = [i for (i,) in self._db.execute('SELECT name FROM cache')]
+
+        return (i for i in names)
+
+    def _read(self, name):
+        with self._lock:
+            if name in self._pending:
+                return self._pending[name]
+
+            row = self._db.execute('SELECT expires_at, data FROM cache WHERE name = ?', (name,)).fetchone()
+
+        return row
+
+    def _write(self, name, expires_at, blob):
+        with self._lock:
+            self._pending[name] = (expires_at, blob)
+
+            if len(self._pending) >= self.batch_size:
+                self.__write()
+
+    def flush(self):
+        """Write all pending dumps to the database."""
+
+        with self._lock:
+            self.__write()
+
+    def __write(self):
+        """Write pending dumps in a single transaction. Must be called with the lock held."""
+
+        if not self._pending:
+            return
+
+        replaced = SqliteCacheManager.__write_pending(self._db, self._pending)
+
+        for (name, (_, blob)) in self._pending.items():
+            self.stats.record_size(name, len(blob) - replaced.get(name, 0))
+
+        self._pending.clear()
+
+    @staticmethod
+    def __write_pending(db, pending):
+        """
+        Write ``pending`` dumps to ``db`` in a single transaction.
+
+        :returns: Sizes of the rows replaced, by name.
+        """
+
+        with db:
+            db.execute('BEGIN IMMEDIATE')
+
+            # Sizes of the rows being replaced, to keep track of the stored size
+            replaced = {}
+            for name in pending:
+                row = db.execute('SELECT length(data) FROM cache WHERE name = ?', (name,)).fetchone()
+                if row is not None:
+                    replaced[name] = row[0]
+
+            db.executemany(
+                'INSERT OR REPLACE INTO cache (name, expires_at, data) VALUES (?, ?, ?)',
+                [(k, e, d) for k, (e, d) in pending.items()]
+            )
+
+        return replaced
+
+    @staticmethod
+    def __close(db, pending, lock):
+        """Write ``pending`` dumps and close ``db``, when the manager is closed or goes away."""
+
+        with lock:
+            if pending:
+                SqliteCacheManager.__write_pending(db, pending)
+                pending.clear()
+
+            db.close()
+
+    def __delete(self, where, parameters):
+        """Delete cache matching a ``WHERE`` clause. Must be called with the lock held."""
+
+        with self._db:
+            self._db.execute('BEGIN IMMEDIATE')
+            deleted = self._db.execute(f'SELECT name, length(data) FROM cache WHERE {where}', parameters).fetchall()
+            self._db.execute(f'DELETE FROM cache WHERE {where}', parameters)
+
+        for (name, size) in deleted:
+            self.stats.record_size(name, -size)
+
+    def cleanup(self, name):
+        """Cleanup all cache with a ``name``. Supports wildcard (*) deletion."""
+
+        prefix = name.split('*')[0]
+
+        # `GLOB` treats `?` and `[` specially as well, but we only support `*`.
+        pattern = name.replace('[', '[[]').replace('?', '[?]')
+
+        with self._lock:
+            self.__write()
+
+            if prefix:
+                # Limit the search to names starting with `prefix`, using the primary key index.
+                upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+                self.__delete('name >= ? AND name < ? AND name GLOB ?', (prefix, upper, pattern))
+            else:
+                self.__delete('name GLOB ?', (pattern,))
+
+    def purge(self, max_stale=0):
+        """
+        Delete expired cache.
+
+        :param max_stale: Keep cache that expired less than this many seconds ago.
+        """
+
+        with self._lock:
+            self.__write()
+            self.__delete('expires_at < ?', (time.time() - max_stale,))
+
+    def close(self):
+        """Write pending dumps and close the database."""
+
+        with self._lock:
+            self.__write()
+
+        self._finalizer()
+
+class MmapCacheManager(CacheManager):
+    """
+    Memory mapped Cache Manager implementation. Appends all cache to a single data file,
+    and keeps an index of where each entry is in memory, so that cache is read straight
+    from the mapped file.
+
+    Dumps and cleanups leave outdated records in the file. These are removed by compacting
+    the file on a background thread once they make up more than ``compact_ratio`` of it.
+    Incomplete records left behind by a crash are discarded when the file is opened.
+    The file can only be used by one manager at a time, which is enforced with a lock file.
+
+    :param path: Path to the "cache directory". Cache is stored here as ``cache.mmap``.
+    :param compact_ratio: Fraction of the file taken up by outdated records that triggers compaction.
+    :param compact_min: Minimum size in bytes of outdated records before compacting.
+    :raises RuntimeError: If another manager is using the same directory.
+
+    See :class:`CacheManager` for ``serializer``, ``compress``, ``codec`` and ``compress_threshold``.
+    """
+
+    # File layout
+    # -----------
+    # The file starts with `_MAGIC`, followed by records. Each record is a `_RECORD` header
+    # `(crc32, flags, name length, data length, expires_at)`, then the name and the data.
+    # The checksum covers everything in the record after itself. A record with `_DELETED`
+    # set marks an earlier record with the same name as removed. `expires_at` is NaN for
+    # cache that never expires.
+
+    _MAGIC = b'SPECKMM1'
+    _RECORD = struct.Struct('<IBIId')
+    _DELETED = 1
+
+    def __init__(
+        self, path, compact_ratio=0.5, compact_min=1 << 20,
+        serializer=None, compress=True, codec=None, compress_threshold=512
+    ):
+        self._path = path
+        self.compact_ratio = compact_ratio
+        self.compact_min = compact_min
+
+        super().__init__(path, serializer, compress, codec, compress_threshold)
+
+        Path(path).mkdir(parents=True, exist_ok=True)  # Creates cache folder
+
+        self._lock = threading.Lock()
+        self._compact_lock = threading.Lock() # Held by the compaction in progress
+        self._compacting = False
+        self._compactor = None # Thread compacting in the background
+        self._closed = False
+
+        self._file_path = os.path.join(path, 'cache.mmap')
+        self.__lock()
+
+        # Creating or compacting the file was interrupted, the original file (if any) is still intact.
+        if os.path.exists(self._file_path + '.tmp'):
+            os.remove(self._file_path + '.tmp')
+
+        self.__open()
+
+    def __lock(self):
+        """Take the lock file of the data file, which is held until the manager is closed."""
+
+        self._lock_file = open(self._file_path + '.lock', 'a+b')
 
         try:
-            for i in os.listdir(self._path):
-                for n, j in enumerate(els):
-                    k = ''.join(i.split('.')[:-1]) if i.endswith('.dat') else i
-                    if not (
-                        j == '' or (j in k and
-                            (k.index(j) >= k.index(els[0 if n < 1 else n - 1]))
-                            )
-                        ):
-                        break
+            if fcntl is not None:
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(self._lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            self._lock_file.close()
+            raise RuntimeError(f'{self._file_path} is already used by another cache manager.') from None
+
+    @property
+    def path(self):
+        """
+        Returns the directory in which the data file is stored.
+
+        :rtype: :class:`str`
+        """
+        return self._path
+
+    def __open(self):
+        """Open and map the data file, and rebuild the index from its records."""
+
+        # Missing, or left too short to hold any record by a crash
+        if not os.path.exists(self._file_path) or os.path.getsize(self._file_path) < len(self._MAGIC):
+            os.replace(self.__write_tmp([]), self._file_path) # Atomic, so the file is never left empty
+
+        self._file = open(self._file_path, 'r+b', buffering=0)
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self._entries = {} # name -> (offset, length of record, expires_at, data offset, data length)
+        self._index = _KeyIndex()
+        self._dead = 0 # Bytes taken up by outdated records
+
+        if self._map[:len(self._MAGIC)] != self._MAGIC:
+            raise ValueError(f'{self._file_path} is not a speck cache file.')
+
+        end = len(self._MAGIC)
+
+        for (offset, size, flags, name, expires_at, data) in self.__records(end):
+            if name in self._entries:
+                self._dead += self._entries.pop(name)[1]
+
+            if flags & self._DELETED:
+                self._dead += size
+            else:
+                self._entries[name] = (offset, size, expires_at, data, size - (data - offset))
+
+            end = offset + size
+
+        # Anything after the last valid record was left by an interrupted write.
+        if end < len(self._map):
+            self._map.close()
+            self._file.truncate(end)
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self._end = end
+        self._index = _KeyIndex(self._entries)
+
+        sizes = {}
+        for (name, entry) in self._entries.items():
+            prefix = _prefix(name)
+            sizes[prefix] = sizes.get(prefix, 0) + entry[1]
+
+        self.stats.set_sizes(sizes)
+
+    def __records(self, offset):
+        """
+        Iterate over the valid records in the file, starting at ``offset``.
+
+        :returns: A generator of ``(offset, size, flags, name, expires_at, data offset)``.
+        """
+
+        size = len(self._map)
+
+        while offset + self._RECORD.size <= size:
+            (crc, flags, name_len, data_len, expires_at) = self._RECORD.unpack_from(self._map, offset)
+
+            start = offset + self._RECORD.size
+            end = start + name_len + data_len
+
+            if end > size or zlib.crc32(self._map[offset + 4:end]) != crc:
+                break
+
+            name = self._map[start:start + name_len].decode('utf-8')
+            expires_at = None if expires_at != expires_at else expires_at # NaN check
+
+            yield (offset, end - offset, flags, name, expires_at, start + name_len)
+
+            offset = end
+
+    def __record(self, name, expires_at, data, flags=0):
+        """Build a record."""
+
+        name = name.encode('utf-8')
+        header = self._RECORD.pack(
+            0, flags, len(name), len(data),
+            float('nan') if expires_at is None else expires_at
+        )[4:]
+
+        body = header + name + data
+        return struct.pack('<I', zlib.crc32(body)) + body
+
+    def __append(self, record):
+        """Append a record to the file. Must be called with the lock held."""
+
+        self._file.seek(self._end)
+        self._file.write(record)
+
+        offset = self._end
+        self._end += len(record)
+
+        return offset
+
+    def find_all(self):
+        """
+        Find all stored cache.
+
+        :rtype: :class:`generator`
+        """
+
+        with self._lock:
+            return (i for i in list(self._entries))
+
+    def _read(self, name):
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                return None
+
+            (_, _, expires_at, data, length) = entry
+
+            if data + length > len(self._map):
+                self.__remap()
+
+            return (expires_at, self._map[data:data + length])
+
+    def __remap(self):
+        """Map the whole file again, to include records written since it was mapped. Must be called with the lock held."""
+
+        self._map.close()
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _write(self, name, expires_at, blob):
+        record = self.__record(name, expires_at, blob)
+
+        with self._lock:
+            offset = self.__append(record)
+            self.stats.record_size(name, len(record))
+
+            if name in self._entries:
+                self._dead += self._entries[name][1]
+                self.stats.record_size(name, -self._entries[name][1])
+
+            self._entries[name] = (offset, len(record), expires_at, offset + len(record) - len(blob), len(blob))
+            self._index.add(name)
+
+            self.__maybe_compact()
+
+    def cleanup(self, name):
+        """Cleanup all cache with a ``name``. Supports wildcard (*) deletion."""
+
+        with self._lock:
+            for i in self._index.match(name):
+                record = self.__record(i, None, b'', self._DELETED)
+                self.__append(record)
+
+                size = self._entries.pop(i)[1]
+                self._dead += size + len(record)
+                self._index.discard(i)
+                self.stats.record_size(i, -size)
+
+            self.__maybe_compact()
+
+    def __maybe_compact(self):
+        """Start compacting the file if there are enough outdated records. Must be called with the lock held."""
+
+        if self._compacting or self._dead < self.compact_min or self._dead < self._end * self.compact_ratio:
+            return
+
+        self._compacting = True
+        self._compactor = threading.Thread(target=self.compact, daemon=True)
+        self._compactor.start()
+
+    def compact(self):
+        """
+        Rewrite the data file with only the current cache.
+
+        Current records are copied without holding up reads and dumps. These only wait while
+        records written in the meantime are copied too, and the new file replaces the old one.
+        """
+
+        with self._compact_lock:
+            try:
+                self.__compact()
+            finally:
+                with self._lock:
+                    self._compacting = False
+
+    def __compact(self):
+        with self._lock:
+            if self._closed:
+                return
+
+            # Records are never changed once written, so those up to `end` can be
+            # copied from a map of their own while more are appended.
+            end = self._end
+            snapshot = mmap.mmap(self._file.fileno(), end, access=mmap.ACCESS_READ)
+            live = sorted(self._entries.values())
+
+        # New offsets of the copied records, by their current offset
+        moved = {}
+        offset = len(self._MAGIC)
+        for (i, size, _, _, _) in live:
+            moved[i] = offset
+            offset += size
+
+        try:
+            tmp = self.__write_tmp(snapshot[i:i + size] for (i, size, _, _, _) in live)
+        finally:
+            snapshot.close()
+
+        with self._lock:
+            if self._closed:
+                os.remove(tmp)
+                return
+
+            if self._end > len(self._map):
+                self.__remap()
+
+            # Records written since the snapshot follow the copied ones, as they are.
+            tail = self._map[end:self._end]
+            with open(tmp, 'ab') as f:
+                f.write(tail)
+                f.flush()
+                os.fsync(f.fileno())
+
+            entries = {}
+            for (name, (i, size, expires_at, data, length)) in self._entries.items():
+                new = moved[i] if i < end else i - end + offset
+                entries[name] = (new, size, expires_at, data - i + new, length)
+
+            self._map.close()
+            self._file.close()
+
+            # Atomic, so a crash leaves either the old or the new file in place.
+            os.replace(tmp, self._file_path)
+
+            self._file = open(self._file_path, 'r+b', buffering=0)
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+            self._entries = entries
+            self._end = offset + len(tail)
+            self._dead = self._end - len(self._MAGIC) - sum(i[1] for i in entries.values())
+
+    def __write_tmp(self, records):
+        """
+        Write a data file holding ``records`` next to the current one.
+
+        :returns: Path of the new file.
+        """
+
+        tmp = self._file_path + '.tmp'
+
+        with open(tmp, 'wb') as f:
+            f.write(self._MAGIC)
+            for i in records:
+                f.write(i)
+
+            f.flush()
+            os.fsync(f.fileno())
+
+        return tmp
+
+    def close(self):
+        """Close the data file, so that another manager can use it. Compaction in progress is abandoned."""
+
+        with self._lock:
+            self._closed = True
+            compactor = self._compactor
+
+        if compactor is not None and compactor is not threading.current_thread():
+            compactor.join()
+
+        with self._lock:
+            self._map.close()
+            self._file.close()
+            self._lock_file.close()
+
+class TieredCacheManager(CacheManager):
+    """
+    Two tiered Cache Manager implementation. Keeps recently used cache in a bounded
+    in-memory tier, in front of a persistent tier.
+
+    Cache found only in the persistent tier is promoted into memory when read.
+    Dumps and cleanups are applied to memory right away, and to the persistent tier on
+    a background thread. Call :meth:`flush` to wait for them, which also happens when
+    the manager is closed, garbage collected, or the interpreter exits. Cache cleaned up
+    in memory is no longer read from the persistent tier in the meantime. Dumps which
+    fail to be written are counted as ``write_errors`` in ``stats``.
+
+    :param path: Path to the "cache directory", used by the default persistent tier.
+    :param front: In-memory tier. Defaults to an uncompressed :class:`BufferedCacheManager`
+        of ``max_entries``, since reads from it are the most frequent.
+    :param back: Persistent tier. Defaults to a :class:`FileCacheManager` in ``path``.
+    :param max_entries: Size of the default in-memory tier.
+    :param write_behind: Write to the persistent tier on a background thread.
+        If ``False``, dumps and cleanups are applied to both tiers before returning.
+    :param serializer: :class:`serializers.Serializer` of the default tiers.
+    :param codec: :class:`compression.Codec`, or its name, of the default persistent tier.
+        The default in-memory tier is uncompressed.
+    :param compress_threshold: See :class:`CacheManager`, for the default persistent tier.
+
+    ``stats`` covers reads and dumps through this manager. Each tier keeps its own
+    ``stats`` too, including the size of its stored cache.
+    """
+
+    def __init__(
+        self, path, front=None, back=None, max_entries=1024, write_behind=True,
+        serializer=None, codec=None, compress_threshold=512
+    ):
+        self.front = front if front is not None else BufferedCacheManager(
+            max_entries=max_entries, serializer=serializer, codec='none'
+        )
+        self.back = back if back is not None else FileCacheManager(
+            path, serializer=serializer, codec=codec, compress_threshold=compress_threshold
+        )
+        self.write_behind = write_behind
+
+        super().__init__(path, serializer, codec=codec, compress_threshold=compress_threshold)
+
+        self._lock = threading.Lock()
+        self._pending = {} # Dumps not yet written to the persistent tier
+        self._cleaning = [] # Patterns cleaned up from memory, but not yet from the persistent tier
+        self._cleanups = 0 # Number of cleanups started, so cache read meanwhile isn't promoted
+        self._queue = queue.Queue()
+
+        if write_behind:
+            # The writer only holds what it needs, so that the manager can still be garbage collected.
+            writer = threading.Thread(
+                target=TieredCacheManager.__writer,
+                args=(self._queue, self.back, self._pending, self._cleaning, self._lock, self.stats),
+                daemon=True
+            )
+            writer.start()
+
+            self._finalizer = weakref.finalize(self, TieredCacheManager.__stop, self._queue, writer)
+
+    @staticmethod
+    def __writer(ops, back, pending, cleaning, lock, stats):
+        """Write queued operations to the persistent tier, in order, until ``None`` is queued."""
+
+        while True:
+            op = ops.get()
+
+            if op is None:
+                ops.task_done()
+                return
+
+            (op, name, entry) = op
+
+            try:
+                if op == 'dump':
+                    back.dump(name, entry[1], expires_at=entry[0])
                 else:
-                    os.remove(f"{self._path}/{i}") # Delete the file
+                    back.cleanup(name)
+            except Exception: # Don't stop writing everything else
+                stats.record_write_error(name)
+            finally:
+                with lock:
+                    # Unless it has been dumped again since
+                    if op == 'dump' and pending.get(name) is entry:
+                        del pending[name]
+                    elif op == 'cleanup':
+                        cleaning.remove(entry)
 
-        except FileNotFoundError:
-            pass
+                ops.task_done()
+
+    @staticmethod
+    def __stop(ops, writer):
+        """Stop ``writer`` once it has written everything already queued."""
+
+        ops.put(None)
+
+        if writer is not threading.current_thread():
+            writer.join()
+
+    def flush(self):
+        """Wait until all dumps have been written to the persistent tier."""
+        self._queue.join()
+
+    def find_all(self):
+        """
+        Find all stored cache.
+
+        :rtype: :class:`generator`
+        """
+
+        self.flush()
+
+        names = set(self.front.find_all() or ())
+        names.update(self.back.find_all() or ())
+
+        return (i for i in names)
+
+    def read_entry(self, name, record=True):
+        """Reads cache with ``name`` if it exists, even if it has expired. See :meth:`CacheManager.read_entry`."""
+
+        start = time.perf_counter()
+        entry = self.__read_entry(name, record)
+
+        if record:
+            self.stats.record_read(name, entry is not None and not _expired(entry[0]), time.perf_counter() - start)
+
+        return entry
+
+    def __read_entry(self, name, record):
+        entry = self.front.read_entry(name, record)
+        if entry is not None:
+            return entry
+
+        with self._lock:
+            entry = self._pending.get(name)
+            cleaned = any(i.fullmatch(name) for i in self._cleaning)
+            cleanups = self._cleanups
+
+        if entry is not None:
+            return entry
+
+        if cleaned: # Still in the persistent tier, but about to be cleaned up
+            return None
+
+        entry = self.back.read_entry(name, record)
+        if entry is not None:
+            with self._lock:
+                # Unless it might have been cleaned up since it was read
+                if self._cleanups == cleanups:
+                    self.front.dump(name, entry[1], expires_at=entry[0]) # Promote
+
+        return entry
+
+    def dump(self, name, data, ttl=None, expires_at=None):
+        """Save data into cache. See :meth:`CacheManager.dump`."""
+
+        start = time.perf_counter()
+        entry = (_expiry(ttl, expires_at), data)
+
+        self.front.dump(name, data, expires_at=entry[0])
+
+        if not self.write_behind:
+            self.back.dump(name, data, expires_at=entry[0])
+        else:
+            with self._lock:
+                self._pending[name] = entry
+                self._queue.put(('dump', name, entry))
+
+        self.stats.record_dump(name, time.perf_counter() - start)
+
+    def cleanup(self, name):
+        """Cleanup all cache with a ``name``. Supports wildcard (*) deletion."""
+
+        pattern = _pattern(name)
+
+        with self._lock:
+            self._cleanups += 1
+            self._cleaning.append(pattern)
+
+            for i in _KeyIndex(self._pending).match(name):
+                del self._pending[i]
+
+            if self.write_behind:
+                # Queued after any pending dumps, so those are cleaned up too.
+                self._queue.put(('cleanup', name, pattern))
+
+        self.front.cleanup(name)
+
+        if not self.write_behind:
+            self.back.cleanup(name)
+
+            with self._lock:
+                self._cleaning.remove(pattern)
+
+    def debug_size(self):
+        """
+        Get size of cache for debugging.
+
+        :returns: Size of stored cache in both tiers in bytes.
+        """
+        return self.front.debug_size() + self.back.debug_size()
+
+    def close(self):
+        """Write pending dumps to the persistent tier, stop the background thread, and close both tiers."""
+
+        if self.write_behind:
+            self._finalizer()
+            self.write_behind = False # Later dumps are written right away
+
+        self.front.close()
+        self.back.close()
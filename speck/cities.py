@@ -0,0 +1,179 @@
+"""
+Search index over a list of known cities.
+Used by :meth:`client.Client.find_city` to look cities up by name without going through
+every one of them.
+"""
+
+import json
+import os
+import threading
+import unicodedata
+
+from array import array
+from bisect import bisect_left
+from itertools import islice
+
+__all__ = [
+    'CityIndex',
+    'get_index'
+]
+
+CITIES = os.path.join(os.path.dirname(__file__), 'etc/cities/cities_p.json')
+
+_LAST = chr(0x10FFFF) # Sorts after any other character
+
+def _normalize(text):
+    """Case, accent and whitespace insensitive form of ``text``."""
+
+    text = text.casefold()
+
+    if not text.isascii():
+        text = ''.join(i for i in unicodedata.normalize('NFKD', text) if not unicodedata.combining(i))
+
+    return ' '.join(text.split())
+
+class CityIndex:
+    """
+    Search index over a list of cities. Names are compared case, accent and whitespace
+    insensitively.
+
+    Names starting with a query are found with a sorted index of names, and names with a
+    word starting with it with a sorted index of their words. Anything else is found with an
+    index of the sequences of up to three letters (n-grams) in every name.
+
+    :param cities: List of cities, as dictionaries with at least a ``name``.
+    :var cities: The list of cities.
+    """
+
+    def __init__(self, cities):
+        self.cities = cities
+
+        # Cities are numbered in order of their names, so that sorting ids sorts names
+        names = [_normalize(i['name']) for i in cities]
+        order = sorted(range(len(cities)), key=names.__getitem__)
+
+        self._names = [names[i] for i in order]
+        self._cities = [cities[i] for i in order]
+
+        # Rest of the name from every word but the first, sorted
+        words = sorted(
+            (name[j:], i)
+            for (i, name) in enumerate(self._names)
+            for j in range(1, len(name)) if name[j].isalnum() and not name[j - 1].isalnum()
+        )
+        self._words = [i for (i, _) in words]
+        self._word_ids = array('I', (i for (_, i) in words))
+
+        # N-gram of one to three letters -> ids of cities with it in their name, ascending
+        grams = {}
+        for (i, name) in enumerate(self._names):
+            for j in {name[k:k + n] for n in (1, 2, 3) for k in range(len(name) - n + 1)}:
+                ids = grams.get(j)
+                if ids is None:
+                    ids = grams[j] = array('I')
+                ids.append(i)
+
+        self._grams = grams
+
+    @classmethod
+    def load(cls, path=CITIES):
+        """
+        Build an index from a JSON file with a list of cities.
+
+        :raises OSError: If the file can't be read.
+        """
+
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.loads(f.read()))
+
+    def __len__(self):
+        return len(self.cities)
+
+    @staticmethod
+    def __starting(keys, prefix):
+        """Range of the indices of the sorted ``keys`` starting with ``prefix``."""
+        return range(bisect_left(keys, prefix), bisect_left(keys, prefix + _LAST))
+
+    def __containing(self, query):
+        """Ids of cities whose name contains ``query``, ascending."""
+
+        if len(query) <= 3: # Every city with the n-gram matches
+            return self._grams.get(query, ())
+
+        # Any trigram's cities will do, since every match is checked anyway
+        candidates = min(
+            (self._grams.get(query[i:i + 3], ()) for i in range(len(query) - 2)),
+            key=len
+        )
+
+        names = self._names
+        return (i for i in candidates if query in names[i])
+
+    def search(self, query, k=None):
+        """
+        Find cities whose name contains ``query``. Exact matches come first, then names
+        starting with ``query``, then names with a word starting with it, then the rest.
+        Matches are sorted by name otherwise.
+
+        :param k: Only return the best ``k`` matches.
+        :returns: Matching cities from ``cities``, best first.
+        :rtype: list[dict]
+        """
+
+        query = _normalize(query)
+        if not query:
+            return []
+
+        # Ids of names starting with `query`, which sort right after it
+        prefixed = self.__starting(self._names, query)
+        found = list(prefixed[:k])
+
+        if len(found) != k:
+            # Ids of names with a later word starting with `query`
+            word_ids = map(self._word_ids.__getitem__, self.__starting(self._words, query))
+            words = {i for i in word_ids if i not in prefixed}
+            found.extend(sorted(words)[:None if k is None else k - len(found)])
+
+        if len(found) != k:
+            rest = (i for i in self.__containing(query) if i not in prefixed and i not in words)
+            found.extend(islice(rest, None if k is None else k - len(found)))
+
+        return [self._cities[i] for i in found]
+
+    def autocomplete(self, prefix, k=10):
+        """
+        Find cities whose name starts with ``prefix``, sorted by name.
+
+        :param k: Maximum number of cities returned, or ``None`` for all of them.
+        :rtype: list[dict]
+        """
+
+        prefix = _normalize(prefix)
+        if not prefix:
+            return []
+
+        return [self._cities[i] for i in self.__starting(self._names, prefix)[:k]]
+
+# ---------------------------
+
+_INDEXES = {}
+_INDEXES_LOCK = threading.Lock()
+
+def get_index(path=CITIES):
+    """
+    Get the index of the cities in a JSON file, which is loaded the first time it's needed
+    and then shared. Defaults to the list of cities bundled with speck.
+
+    :raises OSError: If the file can't be read.
+    :rtype: :class:`CityIndex`
+    """
+
+    path = os.path.abspath(path)
+
+    with _INDEXES_LOCK: # Only build it once, even if many threads need it at once
+        index = _INDEXES.get(path)
+
+        if index is None:
+            index = _INDEXES[path] = CityIndex.load(path)
+
+    return index
@@ -3,54 +3,285 @@ WeatherAPI client implementation.
 Use this to make requests to weatherapi.com.
 """
 
-import os
-import json
+import re
+import time
+import threading
 
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from datetime import datetime as dt
+from datetime import timedelta as td
 
 import requests
 
+from . import adapter
 from . import cache
+from . import cities
+from . import decoding
 from . import errors
+from . import hooks
+from . import serializers
 from . import types
 
 __all__ = ['Client']
 
-# some constants
-_TYPE_CACHE = 'c'
-_TYPE_JSON = 'r'
+# Parsers --------------------
+# Convert raw weatherapi responses into `types` objects.
+# With `lazy`, points are only built from the response when they are first used.
+
+def _parse_current(response, lazy=False):
+    return types.HourlyPoint.from_raw(response["location"], response["current"], lazy)
+
+def _parse_forecast(response, lazy=False):
+    # A tuple of the current weather (`HourlyPoint`)
+    # and a list of forecasted days (`DailyPoint`s).
+    # Every point shares the response's location.
+    location = types.Location.from_raw(response["location"])
+
+    return (
+        types.HourlyPoint.from_raw(location, response["current"], lazy),
+        [
+            types.DailyPoint(location, i["day"], i["astro"], i["hour"], lazy)
+            for i in response["forecast"]["forecastday"]
+        ]
+    )
+
+def _parse_astronomy(response, lazy=False):
+    return types.AstroPoint.from_raw(response["location"], response["astronomy"]["astro"], lazy)
+
+def _parse_ip(response, lazy=False):
+    return types.IpPoint.from_raw(response, lazy)
+
+def _parse_search(response, lazy=False):
+    return [
+        types.Location.from_raw(i, lazy)
+        for i in response
+    ]
+
+def _parse_sports(response, lazy=False):
+    # `SportsPoint` contains data per sports event. It's not specific
+    # to any type of sport, nor is it a collection. We use a dictionary
+    # with the type of sport as a key, and list of `SportsPoints` as its value.
+    return {
+        j: [types.SportsPoint.from_raw(i, lazy) for i in response[j]]
+        for j in ['football', 'cricket', 'golf']
+    }
+
+# ----------------------------
+
+# Persistent cache managers, selected with `cache_file`.
+_FILE_CACHE = {
+    'file': cache.FileCacheManager,
+    'sqlite': cache.SqliteCacheManager,
+    'mmap': cache.MmapCacheManager,
+    'tiered': cache.TieredCacheManager
+}
+
+class _SingleFlight:
+    """
+    Deduplicates concurrent calls with the same key. The first caller makes the call,
+    and everyone else asking for the same key meanwhile waits for and shares its result.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func):
+        """Call ``func``, unless a call for ``key`` is already in flight."""
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+
+            if leader:
+                call = self._calls[key] = Future()
+
+        if not leader:
+            return call.result() # Raises the leader's exception, if any
+
+        return self.__run(key, call, func)
+
+    def start(self, key, func):
+        """Call ``func`` on a background thread, unless a call for ``key`` is already in flight."""
+
+        with self._lock:
+            if key in self._calls:
+                return
+
+            call = self._calls[key] = Future()
+
+        threading.Thread(target=self.__background, args=(key, call, func), daemon=True).start()
+
+    def __background(self, key, call, func):
+        """Run a call made with ``start``. Its error is only published to everyone waiting on ``key``."""
+
+        try:
+            self.__run(key, call, func)
+        except Exception:
+            pass
+
+    def __run(self, key, call, func):
+        """Call ``func`` and publish its result to everyone waiting on ``key``."""
+
+        try:
+            result = func()
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
 
 class Client:
     """
     Represents a connection to weatherapi.com.
     Use this class to interact with the weatherapi API.
 
+    :param use_cache: Cache responses, so repeated requests don't need to reach weatherapi.
+    :param cache_file: Keep cache on disk instead of in memory. ``True`` or ``'file'`` stores
+        a file per response, ``'sqlite'`` stores everything in a single SQLite database, and
+        ``'mmap'`` in a single memory mapped file. ``'tiered'`` keeps recently used cache in
+        memory in front of cache files.
+    :param cache_path: Directory in which cache is kept on disk.
+    :param max_workers: Default number of worker threads used by bulk requests
+        such as ``current_many``.
+    :param pool_connections: Number of host connection pools to keep.
+    :param pool_maxsize: Maximum number of connections kept open per host.
+        Defaults to ``max_workers``.
+    :param keep_alive: Reuse connections between requests.
+    :param tcp_keepalive: Idle seconds before TCP keep-alive probes are sent on an
+        open connection, or ``None`` to use the system defaults.
+    :param timeout: Default ``(connect, read)`` timeout in seconds for requests.
+    :param timeouts: Timeouts per request type, overriding ``timeout``. See ``TYPES``.
+    :param limiter: A :class:`limiter.RateLimiter` pacing requests made by this client.
+        It can be shared between clients.
+    :param stale_while_revalidate: When cache is outdated, return it immediately and
+        update it in the background instead of waiting for a new response.
+    :param max_stale: Maximum time in seconds since cache expired, for it to be returned with
+        ``stale_while_revalidate``.
+    :param ttl: Time in seconds for which responses are cached, per request type, overriding
+        the defaults in ``TTL``. See ``TYPES``.
+    :param observers: :class:`hooks.Observer` objects notified about every request.
+    :param lazy: Keep the raw response in returned points, and only convert it into typed
+        attributes when they are first read. Makes large responses such as forecasts
+        much cheaper when only a few points are used.
+    :param json_backend: JSON library responses are decoded with. ``'auto'`` uses ``orjson``
+        or ``ujson`` when installed, and ``json`` otherwise. See :func:`decoding.get_backend`.
+    :param cache_raw: Cache responses as the JSON received from weatherapi, instead of
+        the `types` objects built from them. Cache is smaller, faster to write, and can
+        be read by any version of speck, but points are built again from it on every
+        read, lazily. Raw cache is kept apart from other cache, with names ending in ``-raw``.
+    :param city_index: :class:`cities.CityIndex` searched by ``find_city``. Defaults to the index
+        of the cities bundled with speck, which is built when first needed and shared by every client.
+    :param serializer: :class:`serializers.Serializer` cache is stored with. Defaults to
+        :class:`serializers.PickleSerializer`, or :class:`serializers.RawSerializer` with
+        ``cache_raw``. It must be able to store `types` objects, which JSON and msgpack can't,
+        or raw responses (``bytes``) with ``cache_raw``, which JSON can't.
+    :param codec: :class:`compression.Codec`, or its name, cache is compressed with. Defaults to ``zlib``.
+    :param compress_threshold: Cache smaller than this many bytes is stored uncompressed.
+    :raises ValueError: If ``cache_file`` isn't one of the above, or ``serializer`` can't store the cache.
     :var session: A `requests.Session` object. Requests are made with this (``session.get``).
+    :var adapter: The :class:`adapter.PooledAdapter` mounted on ``session``.
     """
 
     BASE = "https://api.weatherapi.com/v1"
 
-    def __init__(self, token, use_cache=False, cache_file=False, cache_path='.cache'):
+    # Bytes read at a time from streamed responses.
+    STREAM_CHUNK = 16384
+
+    # Request types, which `timeouts`, `ttl` and cache statistics are keyed by.
+    # Cache names start with these, e.g. `astro-london`.
+    TYPES = ('current', 'forecast', 'history', 'astro', 'iplookup', 'search', 'sports', 'timezone')
+
+    # Time in seconds for which responses are cached, per request type.
+    # `None` keeps them until the end of the day. Other types are never outdated.
+    TTL = {
+        'current': 600,
+        'forecast': 600,
+        'history': 600,
+        'astro': None,
+        'sports': None
+    }
+
+    def __init__(self, token, use_cache=False, cache_file=False, cache_path='.cache', max_workers=8,
+                 pool_connections=10, pool_maxsize=None, keep_alive=True, tcp_keepalive=None,
+                 timeout=(4, 4), timeouts=None, limiter=None, stale_while_revalidate=False, max_stale=3600,
+                 ttl=None, observers=None, lazy=False, json_backend='auto', cache_raw=False,
+                 city_index=None, serializer=None, codec=None, compress_threshold=512):
         self._token = token
+        self.max_workers = max_workers
+        self.limiter = limiter
+
+        self.stale_while_revalidate = stale_while_revalidate
+        self.max_stale = max_stale
+
+        self.ttl = dict(self.TTL, **Client.__types(ttl))
+
+        self.observers = list(observers or ())
+        self.lazy = lazy
+        self.json_backend = decoding.get_backend(json_backend)
+        self.cache_raw = cache_raw
+
+        self.timeout = timeout
+        self.timeouts = Client.__types(timeouts)
+
+        self._inflight = _SingleFlight()
+        self._legacy_cleaned = set() # Request types without cache named by older versions
+
         self.session = requests.Session()
 
+        # Keep at least one pooled connection per worker by default, otherwise
+        # `urllib3` throws away connections that can't be returned to the pool.
+        self.adapter = adapter.PooledAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize or max_workers,
+            keep_alive=keep_alive,
+            tcp_keepalive=tcp_keepalive
+        )
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+
+        if serializer is None:
+            # Raw responses are already bytes
+            serializer = serializers.RawSerializer() if cache_raw else serializers.PickleSerializer()
+        elif not (serializer.binary if cache_raw else serializer.typed):
+            raise ValueError(f"{type(serializer).__name__} can't store {'raw responses' if cache_raw else '`types` objects'}.")
+
+        if cache_file and cache_file is not True and cache_file not in _FILE_CACHE:
+            raise ValueError(f'Unknown cache_file {cache_file!r}.')
+
+        options = {'serializer': serializer, 'codec': codec, 'compress_threshold': compress_threshold}
+
         if use_cache:
             if cache_file:
-                self.cache = cache.FileCacheManager(cache_path)
+                self.cache = _FILE_CACHE['file' if cache_file is True else cache_file](cache_path, **options)
             else:
-                self.cache = cache.BufferedCacheManager(cache_path)
+                self.cache = cache.BufferedCacheManager(cache_path, **options)
         else:
-            self.cache = cache.CacheManager(cache_path)
+            self.cache = cache.CacheManager(cache_path, **options)
 
-        # This looks for the cities list file
-        with open(
-            os.path.join(os.path.dirname(__file__), 'etc/cities/cities_p.json'),
-            'r', encoding='utf-8'
-        ) as f:
-            self.cities = json.loads(f.read())
+        self._city_index = city_index
 
     # Utils ----------------------
 
+    # Endpoint names also accepted as request types
+    _ALIASES = {'astronomy': 'astro', 'ip': 'iplookup'}
+
+    @staticmethod
+    def __types(values):
+        """Copy of ``values``, keyed by request type, with endpoint names replaced by their type."""
+        return {Client._ALIASES.get(k, k): v for (k, v) in (values or {}).items()}
+
+    @staticmethod
+    def __type(endpoint):
+        """Request type of a request to ``endpoint``."""
+
+        name = endpoint.split('.')[0]
+        return Client._ALIASES.get(name, name)
+
     @staticmethod
     def __is_error_code(response):
         """
@@ -87,76 +318,391 @@ class Client:
 
         return
 
-    def __make_request(self, endpoint, parameters):
-        """Private method to make a request to ``weatherapi.com``."""
+    def __make_request(self, endpoint, parameters, event):
+        """
+        Private method to make a request to ``weatherapi.com``.
+
+        :param event: :class:`hooks.RequestEvent` to record the response and its timings in.
+        :returns: The response body, and the response decoded from JSON.
+        """
+
+        if self.limiter is not None:
+            self.limiter.acquire() # Might raise `RateLimited`
 
         try:
+            start = time.perf_counter()
+
             # Does the actual request
-            return self.session.get(f"{self.BASE}/{endpoint}{parameters}",
-                                    timeout=(4, 4)).json()
+            response = self.session.get(f"{self.BASE}/{endpoint}{parameters}",
+                                        timeout=self.timeouts.get(Client.__type(endpoint), self.timeout))
+
+            event.status = response.status_code
+            event.bytes = len(response.content)
+            event.timings = dict(getattr(response, 'timings', {}), total=time.perf_counter() - start)
+
+            start = time.perf_counter()
+            data = self.json_backend.loads(response.content)
+            event.decode = time.perf_counter() - start
+
+            return (response.content, data)
+        except Exception as e:
+            raise errors.InternalError(f"Unable to fetch data at this time: {e}", 9999)
+
+    def __stream_days(self, endpoint, parameters, event):
+        """
+        Make a request for a forecast or history, yielding ``DailyPoint``\\s as they are received.
+        See ``__make_request``.
+        """
+
+        if self.limiter is not None:
+            self.limiter.acquire() # Might raise `RateLimited`
+
+        start = time.perf_counter()
+
+        try:
+            response = self.session.get(f"{self.BASE}/{endpoint}{parameters}", stream=True,
+                                        timeout=self.timeouts.get(Client.__type(endpoint), self.timeout))
         except Exception as e:
             raise errors.InternalError(f"Unable to fetch data at this time: {e}", 9999)
 
-    def __generic_request(self, loc, mode, endpoint, parameters, *args, **kwargs):
+        event.status = response.status_code
+        event.timings = dict(getattr(response, 'timings', {}))
+
+        def chunks():
+            for i in response.iter_content(self.STREAM_CHUNK):
+                event.bytes += len(i)
+                yield i
+
+        def decoded(raw):
+            # Includes waiting for the response to be received, since the two are interleaved
+            start = time.perf_counter()
+            try:
+                return next(raw)
+            except StopIteration:
+                return None
+            except Exception as e:
+                raise errors.InternalError(f"Unable to fetch data at this time: {e}", 9999)
+            finally:
+                event.decode += time.perf_counter() - start
+
+        with response:
+            raw = decoding.iter_forecast(chunks(), self.json_backend)
+
+            head = decoded(raw)
+
+            e = Client.__is_error_code(head)
+            if e:
+                if isinstance(e, errors.QuotaExceeded) and self.limiter is not None:
+                    self.limiter.exhaust()
+                raise e
+
+            location = types.Location.from_raw(head["location"])
+
+            while True:
+                day = decoded(raw)
+                if day is None:
+                    break
+
+                parse = time.perf_counter()
+                point = types.DailyPoint(location, day["day"], day["astro"], day["hour"], self.lazy)
+                event.parse += time.perf_counter() - parse
+
+                yield point
+
+        event.timings['total'] = time.perf_counter() - start
+
+    def __stream(self, loc, mode, endpoint, parameters):
+        """
+        Generic streamed request method, for forecasts and history.
+        Streamed responses are neither read from, nor written to cache.
+        """
+
+        if loc == '':
+            raise errors.QueryNotProvided('Location cannot be empty.', 0)
+
+        event = hooks.RequestEvent(endpoint.split('.')[0], mode, 'miss')
+
+        for i in self.observers:
+            i.request_started(event)
+
+        start = time.perf_counter()
+
+        try:
+            yield from self.__stream_days(endpoint, parameters, event)
+        except Exception as e:
+            event.error = type(e)
+            raise
+        finally:
+            event.duration = time.perf_counter() - start
+
+            for i in self.observers:
+                i.request_finished(event)
+
+    def __observed(self, event, func):
+        """Call ``func``, notifying observers before and after."""
+
+        for i in self.observers:
+            i.request_started(event)
+
+        start = time.perf_counter()
+
+        try:
+            return func()
+        except Exception as e:
+            event.error = type(e)
+            raise
+        finally:
+            event.duration = time.perf_counter() - start
+
+            for i in self.observers:
+                i.request_finished(event)
+
+    def __generic_request(self, loc, mode, endpoint, parameters, parse):
         """
         Generic request method, covering any endpoint and parameters.
+        Concurrent requests for the same ``mode`` share a single upstream request.
+
+        :param parse: Function converting the raw weatherapi response into `types` objects.
 
-        :returns: ``(str, response)``. Response can be a `types` object, or a raw
-            weatherapi response. The first element of the tuple is either
-            ``_TYPE_CACHE`` or ``_TYPE_JSON``.
+        :returns: The parsed response, either from cache or from weatherapi.
         """
 
         if loc == '':
             raise errors.QueryNotProvided('Location cannot be empty.', 0)
 
-        n = self.cache.read(mode)
+        if self.cache_raw: # Not the same as cache of `types` objects
+            mode = f'{mode}-raw'
+
+        event = hooks.RequestEvent(endpoint.split('.')[0], mode)
+
+        return self.__observed(event, lambda: self.__lookup(mode, endpoint, parameters, parse, event))
+
+    def __cached(self, data, parse, event):
+        """Get the parsed response from what was read from cache."""
+
+        if not self.cache_raw:
+            return data
+
+        start = time.perf_counter()
+        data = parse(self.json_backend.loads(data), True)
+        event.parse = time.perf_counter() - start
+
+        return data
+
+    def __lookup(self, mode, endpoint, parameters, parse, event):
+        """Find a response in cache, or request it. See ``__generic_request``."""
+
+        entry = self.cache.read_entry(mode)
+        if entry is None:
+            entry = (0, None)
+
+        (expires_at, n) = entry
+
+        if n and (expires_at is None or expires_at > time.time()):
+            event.cache = 'hit'
+            return self.__cached(n, parse, event)
+
         if n:
-            return (_TYPE_CACHE, n)
+            # Running out of requests for this month - outdated data is better than none.
+            if self.limiter is not None and self.limiter.budget_low():
+                event.cache = 'stale'
+                self.cache.stats.record_stale(mode)
+                return self.__cached(n, parse, event)
+
+            if self.stale_while_revalidate and time.time() - expires_at <= self.max_stale:
+                revalidate = hooks.RequestEvent(event.endpoint, mode, 'revalidate')
+                self._inflight.start(mode, lambda: self.__observed(
+                    revalidate, lambda: self.__fetch(mode, endpoint, parameters, parse, revalidate)
+                ))
+
+                event.cache = 'stale'
+                self.cache.stats.record_stale(mode)
+                return self.__cached(n, parse, event)
+
+        # Only the caller making the request gets to update this
+        event.cache = 'coalesced'
+
+        return self._inflight.do(mode, lambda: self.__fetch(mode, endpoint, parameters, parse, event))
+
+    def __fetch(self, mode, endpoint, parameters, parse, event):
+        """Request, parse and cache a response. See ``__generic_request``."""
 
-        response = self.__make_request(endpoint, parameters)
+        # Another request for `mode` might have finished
+        # between our cache miss and getting here. The miss was counted already.
+        entry = self.cache.read_entry(mode, record=False)
+        if entry is not None and entry[1] and (entry[0] is None or entry[0] > time.time()):
+            event.cache = 'hit'
+            return self.__cached(entry[1], parse, event)
+
+        if event.cache != 'revalidate':
+            event.cache = 'miss'
+
+        try:
+            (body, response) = self.__make_request(endpoint, parameters, event)
+        except errors.RateLimited:
+            if entry is not None and entry[1]:
+                event.cache = 'stale'
+                self.cache.stats.record_stale(mode)
+                return self.__cached(entry[1], parse, event) # Outdated, but better than nothing
+            raise
 
         e = Client.__is_error_code(response)
         if e:
+            if isinstance(e, errors.QuotaExceeded) and self.limiter is not None:
+                self.limiter.exhaust()
             raise e
 
-        return (_TYPE_JSON, response)
+        start = time.perf_counter()
+        data = parse(response, self.lazy)
+        event.parse = time.perf_counter() - start
+
+        self.__cleanup_legacy(Client.__type(endpoint))
+        self.cache.dump(mode, body if self.cache_raw else data, expires_at=self.__expires_at(Client.__type(endpoint)))
+
+        return data
+
+    def __cleanup_legacy(self, kind):
+        """
+        Discard cache of the request type ``kind`` named the way older versions did,
+        ``{type}-{location}-now-{time}``, which is never read. Only done once per type.
+        """
+
+        if kind in self._legacy_cleaned:
+            return
+
+        self._legacy_cleaned.add(kind)
+        self.cache.cleanup(f'{kind}-*-now-*')
+
+    # Cache is named after the endpoint and the request's parameters, so the same
+    # request always maps to the same cache name, following the pattern
+    # `{type}-{location}[-{parameters}]`.
+    # Whether the cache is outdated is decided by the expiry time it is stored with.
+
+    @staticmethod
+    def __key(kind, loc, *params):
+        """Get the cache name for a request."""
+
+        # Locations are case and whitespace insensitive.
+        loc = re.sub(r'\s*,\s*', ',', ' '.join(loc.lower().split()))
+
+        return '-'.join([kind, loc, *map(str, params)])
+
+    def __expires_at(self, kind):
+        """Get the expiry time of a new response for the request type ``kind``."""
+
+        if kind not in self.ttl:
+            return None
+
+        ttl = self.ttl[kind]
+
+        if ttl is None: # Until the end of the day
+            return dt.combine(dt.now().date() + td(days=1), dt.min.time())
+
+        return dt.now() + td(seconds=ttl)
+
+    def __map(self, func, locs, workers, ordered, *args):
+        """
+        Call ``func(loc, *args)`` for every location in ``locs`` on a pool of worker threads.
+        A :class:`errors.WeatherApiError` raised for a location is returned in place of its result.
+
+        :returns: A list of results in input order if ``ordered``, otherwise a generator
+            of ``(loc, result)`` tuples in order of completion.
+        """
+
+        def call(loc):
+            try:
+                return func(loc, *args)
+            except errors.WeatherApiError as e:
+                return e
+
+        locs = list(locs)
+        workers = workers or self.max_workers
 
-    # All implementations should follow the same naming pattern.
-    # `{type}-{location}-now-{time-identifier}`
-    # Old cache will be cleaned up disregarding `time-identifier`.
-    # So, any cache starting with `{type}-{location}` will be deleted
-    # if a new cache starting with `{type}-{location}` is dumped.
+        if ordered:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                return list(executor.map(call, locs))
 
-    def __cache_dump(self, data, mode):
-        """Dump response cache with name ``mode``."""
-        self.cache.cleanup(mode.split('-now-')[0] + '-now-*') # Discard any old cache
-        self.cache.dump(mode, data) # Writes cache
+        return Client.__completed(call, locs, workers)
+
+    @staticmethod
+    def __completed(call, locs, workers):
+        """Generator yielding ``(loc, call(loc))`` as soon as each call completes."""
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(call, i): i for i in locs}
+
+            try:
+                for f in as_completed(futures):
+                    yield (futures[f], f.result())
+            finally:
+                # Don't start anything else if the caller stops early
+                for f in futures:
+                    f.cancel()
 
     # ----------------------------
 
-    def find_city(self, loc):
+    def connection_stats(self):
+        """
+        Get connection reuse statistics for this client's session.
+        See :meth:`adapter.PooledAdapter.connection_stats`.
+
+        :rtype: ``dict{str: int | float}``
+        """
+        return self.adapter.connection_stats()
+
+    def cache_stats(self):
+        """
+        Get cache statistics, including stale cache served by this client.
+        See :meth:`cache.CacheStats.snapshot`.
+
+        :rtype: ``dict``
+        """
+        return self.cache.stats.snapshot()
+
+    @property
+    def city_index(self):
+        """
+        Index of known cities searched by ``find_city``, built when first used.
+
+        :rtype: :class:`cities.CityIndex`
+        """
+
+        if self._city_index is None:
+            self._city_index = cities.get_index()
+
+        return self._city_index
+
+    @property
+    def cities(self):
+        """
+        Known cities, with their ``name``, ``lat``, ``lon`` and ``country``.
+        Assigning a list of cities builds a new ``city_index`` from it, for this client only.
+        The list isn't indexed again when changed in place, so assign a new one instead.
+
+        :rtype: list[dict]
+        """
+        return self.city_index.cities
+
+    @cities.setter
+    def cities(self, value):
+        self._city_index = cities.CityIndex(list(value))
+
+    def find_city(self, loc, k=None):
         """
         Try to find a city with a match from a known list of locations.
         This method is highly unlikely to be used frequently, since weatherAPI tries
         to interpret location names even if incorrect, but is provided anyway.
+
+        Matches are ranked, best first. See :meth:`cities.CityIndex.search`.
+
+        :param k: Only return the best ``k`` matches.
+        :returns: Cities with ``loc`` in their name. See ``cities``.
+        :rtype: list[dict]
         """
         if loc == '':
             raise errors.QueryNotProvided('Location cannot be empty.', 0)
 
-        return [  # Generates a list of city names containing the string `loc`
-            i for i in self.cities if loc.lower() in i['name'].lower()
-        ]
-
-    # The cache implementation keeps track of data
-    # with their ``name``s. We use ``location``+``ident``
-    # (``ident`` is some identifier - usually time) as the
-    # name to decide whether the cache is outdated or not.
-    # If ``ident`` is some time, then its generalized to a range
-    # (say if current time is ``2021-04-01 19:20:30``
-    # -> ``2021-04-01 19``), so anything else within that range
-    # get matched.'
-    # ``2021-04-01 19:05:51`` -> ``2021-04-01 19``
-    # ``2021-04-01 19:45:21`` -> ``2021-04-01 19``
+        return self.city_index.search(loc, k)
 
     def current(self, loc):
         """
@@ -176,20 +722,9 @@ class Client:
         :rtype: :class:`types.HourlyPoint`
         """
 
-        # https://docs.python.org/3/library/datetime.html#strftime-strptime-behavior
-        mode = f"current-{loc.lower()}-now-{dt.now().strftime('%Y-%m-%d-%H-%M')[:-1]}"
-
-        _type, response = self.__generic_request(loc, mode, 'current.json', f'?key={self._token}&q={loc}')
-
-        if _type == _TYPE_CACHE:
-            return response
-
-        # Creates the `HourlyPoint` object
-        data = types.HourlyPoint.from_raw(response["location"], response["current"])
+        mode = Client.__key('current', loc)
 
-        self.__cache_dump(data, mode)
-
-        return data
+        return self.__generic_request(loc, mode, 'current.json', f'?key={self._token}&q={loc}', _parse_current)
 
         # The same pattern is followed for all other API methods implemented.
 
@@ -205,26 +740,43 @@ class Client:
         :rtype: ``(types.HourlyPoint, list[types.DailyPoint])``
         """
 
-        mode = f"forecast-{loc.lower()}-now-{dt.now().strftime('%Y-%m-%d-%H-%M')[:-1]}"
+        mode = Client.__key('forecast', loc, min(days, 10))
 
-        _type, response = self.__generic_request(loc, mode, 'forecast.json', f'?key={self._token}&q={loc}&days={min(days, 10)}')
+        return self.__generic_request(loc, mode, 'forecast.json', f'?key={self._token}&q={loc}&days={min(days, 10)}',
+                                      _parse_forecast)
 
-        if _type == _TYPE_CACHE:
-            return response
+    def current_many(self, locs, workers=None, ordered=True):
+        """
+        Get current weather conditions for many locations at once.
+        Requests are made in parallel, sharing this client's session and cache.
 
-        # `data` here is a tuple of the current weather (`HourlyPoint`)
-        # and a list of forecasted days (`DailyPoint`s).
-        data = (
-            types.HourlyPoint.from_raw(response["location"], response["current"]),
-            [
-                types.DailyPoint(response["location"], i["day"], i["astro"], i["hour"])
-                for i in response["forecast"]["forecastday"]
-            ]
-        )
+        :param locs: Iterable of query locations. See docs on method ``current``.
+        :param workers: Number of worker threads. Defaults to ``max_workers``.
+        :param ordered: Return results in input order. If ``False``, results are
+            yielded as soon as they are available.
 
-        self.__cache_dump(data, mode)
+        :returns: A list of :class:`types.HourlyPoint`, or a generator of ``(loc, types.HourlyPoint)``
+            if not ``ordered``. If a request fails, its :class:`errors.WeatherApiError`
+            takes the place of the result.
+        """
+        return self.__map(self.current, locs, workers, ordered)
 
-        return data
+    def forecast_many(self, locs, days=3, workers=None, ordered=True):
+        """
+        Get weather forecasts for many locations at once.
+        Requests are made in parallel, sharing this client's session and cache.
+
+        :param locs: Iterable of query locations. See docs on method ``current``.
+        :param days: See docs on method ``forecast``.
+        :param workers: Number of worker threads. Defaults to ``max_workers``.
+        :param ordered: Return results in input order. If ``False``, results are
+            yielded as soon as they are available.
+
+        :returns: A list of ``(types.HourlyPoint, list[types.DailyPoint])``, or a generator of
+            ``(loc, (types.HourlyPoint, list[types.DailyPoint]))`` if not ``ordered``.
+            If a request fails, its :class:`errors.WeatherApiError` takes the place of the result.
+        """
+        return self.__map(self.forecast, locs, workers, ordered, days)
 
     def astronomy(self, loc):
         """
@@ -235,18 +787,9 @@ class Client:
         :rtype: :class:`types.AstroPoint`
         """
 
-        mode = f"astro-{loc.lower()}-now-{dt.now().strftime('%Y-%m-%d')}"
-
-        _type, response = self.__generic_request(loc, mode, 'astronomy.json', f'?key={self._token}&q={loc}')
-
-        if _type == _TYPE_CACHE:
-            return response
+        mode = Client.__key('astro', loc)
 
-        data = types.AstroPoint.from_raw(response["location"], response["astronomy"]["astro"])
-
-        self.__cache_dump(data, mode)
-
-        return data
+        return self.__generic_request(loc, mode, 'astronomy.json', f'?key={self._token}&q={loc}', _parse_astronomy)
 
     def ip_lookup(self, ip):
         """
@@ -257,19 +800,9 @@ class Client:
         :rtype: :class:`IpPoint`
         """
 
-        mode = f"iplookup-{ip}"
-
-        _type, response = self.__generic_request(ip, mode, 'ip.json', f'?key={self._token}&q={ip}')
+        mode = Client.__key('iplookup', ip)
 
-        if _type == _TYPE_CACHE:
-            return response
-
-        data = types.IpPoint.from_raw(response)
-
-        self.cache.dump(mode, data)
-        # cleanup not required here
-
-        return data
+        return self.__generic_request(ip, mode, 'ip.json', f'?key={self._token}&q={ip}', _parse_ip)
 
     def search(self, loc):
         """
@@ -280,21 +813,9 @@ class Client:
         :rtype: ``list[types.Location]``
         """
 
-        mode = f"search-{loc.lower()}"
-
-        _type, response = self.__generic_request(loc, mode, 'search.json', f'?key={self._token}&q={loc}')
-
-        if _type == _TYPE_CACHE:
-            return response
+        mode = Client.__key('search', loc)
 
-        data = [
-            types.Location.from_raw(i)
-            for i in response
-        ]
-
-        self.cache.dump(mode, data)
-
-        return data
+        return self.__generic_request(loc, mode, 'search.json', f'?key={self._token}&q={loc}', _parse_search)
 
     def timezone_info(self, loc):
         """
@@ -311,13 +832,22 @@ class Client:
         # No cache
         # since localtime is a returned parameter.
 
-        response = self.__make_request('timezone.json', f'?key={self._token}&q={loc}')
+        event = hooks.RequestEvent('timezone', Client.__key('timezone', loc), 'miss')
 
-        e = Client.__is_error_code(response)
-        if e:
-            raise e
+        def request():
+            (_, response) = self.__make_request('timezone.json', f'?key={self._token}&q={loc}', event)
+
+            e = Client.__is_error_code(response)
+            if e:
+                raise e
+
+            start = time.perf_counter()
+            data = types.Location.from_raw(response["location"], self.lazy)
+            event.parse = time.perf_counter() - start
+
+            return data
 
-        return types.Location.from_raw(response["location"])
+        return self.__observed(event, request)
 
     def sports_lookup(self, loc):
         """
@@ -329,25 +859,9 @@ class Client:
 
         :rtype: ``dict{str: list[SportsPoint]}``
         """
-        mode = f"sports-{loc.lower()}-now-{dt.now().strftime('%Y-%m-%d')}"
+        mode = Client.__key('sports', loc)
 
-        _type, response = self.__generic_request(loc, mode, 'sports.json', f'?key={self._token}&q={loc}')
-
-        if _type == _TYPE_CACHE:
-            return response
-
-        # `SportsPoint` contains data per sports event. It's not specific
-        # to any type of sport, nor is it a collection. We use a dictionary
-        # with the type of sport as a key, and list of `SportsPoints` as its value.
-        data = {
-            j: [types.SportsPoint.from_raw(i) for i in response[j]]
-            for j in ['football', 'cricket', 'golf']
-        }
-
-
-        self.__cache_dump(data, mode)
-
-        return data
+        return self.__generic_request(loc, mode, 'sports.json', f'?key={self._token}&q={loc}', _parse_sports)
 
     def history(self, loc, days):
         """
@@ -365,26 +879,43 @@ class Client:
         # weatherapi returns history data as an `Forecast` object as per their API.
         # https://www.weatherapi.com/docs/#apis-history
 
-        mode = f"history-{loc.lower()}-now-{dt.now().strftime('%Y-%m-%d-%H-%M')[:-1]}"
+        mode = Client.__key('history', loc, min(days, 10))
 
-        _type, response = self.__generic_request(loc, mode, 'history.json', f'?key={self._token}&q={loc}&days={min(days, 10)}')
+        # Same shape as a forecast.
+        return self.__generic_request(loc, mode, 'history.json', f'?key={self._token}&q={loc}&days={min(days, 10)}',
+                                      _parse_forecast)
 
-        if _type == _TYPE_CACHE:
-            return response
+    def forecast_stream(self, loc, days=3):
+        """
+        Get weather forecast for a location, a day at a time while the response is received.
+        Each day is yielded as soon as it has arrived, so it can be used before the rest, and
+        the whole response is never held in memory at once.
 
-        # `data` here is a tuple of the current weather (`HourlyPoint`)
-        # and a list of forecasted days (`DailyPoint`s).
-        data = (
-            types.HourlyPoint.from_raw(response["location"], response["current"]),
-            [
-                types.DailyPoint(response["location"], i["day"], i["astro"], i["hour"])
-                for i in response["forecast"]["forecastday"]
-            ]
-        )
+        Streamed responses are neither read from, nor written to cache.
 
-        self.__cache_dump(data, mode)
+        :param loc: See docs on method ``current``.
+        :param days: See docs on method ``forecast``.
 
-        return data
+        :returns: A generator of forecasted days.
+        :rtype: Generator[:class:`types.DailyPoint`]
+        """
+
+        mode = Client.__key('forecast', loc, min(days, 10))
+
+        return self.__stream(loc, mode, 'forecast.json', f'?key={self._token}&q={loc}&days={min(days, 10)}')
+
+    def history_stream(self, loc, days):
+        """
+        Get weather history for a location, a day at a time while the response is received.
+        See docs on methods ``history`` and ``forecast_stream``.
+
+        :returns: A generator of historical weather per day.
+        :rtype: Generator[:class:`types.DailyPoint`]
+        """
+
+        mode = Client.__key('history', loc, min(days, 10))
+
+        return self.__stream(loc, mode, 'history.json', f'?key={self._token}&q={loc}&days={min(days, 10)}')
 
     # Aliases ---------------------------------------
 
@@ -0,0 +1,207 @@
+"""
+Compression codecs for cached data.
+Stored blobs start with the id of the codec they were compressed with, so cache
+written with different codecs can be read by any cache manager.
+"""
+
+import lzma
+import zlib
+
+__all__ = [
+    'Codec',
+    'NoCodec',
+    'ZlibCodec',
+    'LzmaCodec',
+    'ZstdCodec',
+    'Lz4Codec',
+    'get_codec'
+]
+
+class Codec:
+    """
+    Abstract class representing a compression codec.
+
+    :var id: Codec id stored with every blob. Must be unique, and must not change.
+    :var name: Name used to pick the codec with :func:`get_codec`.
+    """
+
+    id = None
+    name = None
+
+    def compress(self, data):
+        """Compress ``data`` bytes."""
+        raise NotImplementedError
+
+    def decompress(self, data):
+        """Decompress ``data`` bytes."""
+        raise NotImplementedError
+
+    def encode(self, data, threshold=0):
+        """
+        Compress ``data`` and prefix it with the codec id.
+        Data shorter than ``threshold``, or that doesn't get any smaller, is stored uncompressed.
+        """
+
+        if self.id != NoCodec.id and len(data) >= threshold:
+            compressed = self.compress(data)
+            if len(compressed) < len(data):
+                return bytes((self.id,)) + compressed
+
+        return bytes((NoCodec.id,)) + data
+
+    def __repr__(self):
+        return f'{type(self).__name__}()'
+
+class NoCodec(Codec):
+    """Stores data uncompressed."""
+
+    id = 0
+    name = 'none'
+
+    def compress(self, data):
+        return data
+
+    def decompress(self, data):
+        return data
+
+class ZlibCodec(Codec):
+    """
+    ``zlib`` compression.
+
+    :param level: Compression level, from ``1`` (fastest) to ``9`` (smallest).
+    """
+
+    id = 1
+    name = 'zlib'
+
+    def __init__(self, level=6):
+        self.level = level
+
+    def compress(self, data):
+        return zlib.compress(data, self.level)
+
+    def decompress(self, data):
+        return zlib.decompress(data)
+
+    def __repr__(self):
+        return f'ZlibCodec(level={self.level})'
+
+class LzmaCodec(Codec):
+    """
+    ``lzma`` compression. Smaller than ``zlib``, but much slower.
+
+    :param preset: Compression preset, from ``0`` (fastest) to ``9`` (smallest).
+    """
+
+    id = 2
+    name = 'lzma'
+
+    def __init__(self, preset=6):
+        self.preset = preset
+
+    def compress(self, data):
+        return lzma.compress(data, preset=self.preset)
+
+    def decompress(self, data):
+        return lzma.decompress(data)
+
+    def __repr__(self):
+        return f'LzmaCodec(preset={self.preset})'
+
+class ZstdCodec(Codec):
+    """
+    Zstandard compression. ``zstandard`` must be installed.
+
+    :param level: Compression level, from ``1`` (fastest) to ``22`` (smallest).
+    """
+
+    id = 3
+    name = 'zstd'
+
+    def __init__(self, level=3):
+        import zstandard # Optional dependency
+
+        self.level = level
+        self._compressor = zstandard.ZstdCompressor(level=level)
+        self._decompressor = zstandard.ZstdDecompressor()
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def decompress(self, data):
+        return self._decompressor.decompress(data)
+
+    def __repr__(self):
+        return f'ZstdCodec(level={self.level})'
+
+class Lz4Codec(Codec):
+    """
+    LZ4 compression. Very fast, but not as small. ``lz4`` must be installed.
+
+    :param level: Compression level, from ``0`` (fastest) to ``16`` (smallest).
+    """
+
+    id = 4
+    name = 'lz4'
+
+    def __init__(self, level=0):
+        import lz4.frame # Optional dependency
+
+        self.level = level
+        self._lz4 = lz4.frame
+
+    def compress(self, data):
+        return self._lz4.compress(data, compression_level=self.level)
+
+    def decompress(self, data):
+        return self._lz4.decompress(data)
+
+    def __repr__(self):
+        return f'Lz4Codec(level={self.level})'
+
+# ---------------------------
+
+_CODECS = {i.name: i for i in (NoCodec, ZlibCodec, LzmaCodec, ZstdCodec, Lz4Codec)}
+_DECODERS = {NoCodec.id: NoCodec(), ZlibCodec.id: ZlibCodec()} # Others are created when first needed
+
+# First byte of a `zlib` stream with the default window size. Blobs written before codec ids
+# were stored are plain `zlib` streams, and always start with this.
+_ZLIB_HEADER = 0x78
+
+def get_codec(codec):
+    """
+    Get a codec.
+
+    :param codec: A :class:`Codec`, or the name of one (``'none'``, ``'zlib'``, ``'lzma'``,
+        ``'zstd'`` or ``'lz4'``) to use with its default level. ``None`` is the same as ``'none'``.
+    :raises ValueError: If there is no codec with that name.
+    :raises ImportError: If the codec's library isn't installed.
+    :rtype: :class:`Codec`
+    """
+
+    if isinstance(codec, Codec):
+        return codec
+
+    try:
+        return _CODECS[codec or 'none']()
+    except KeyError:
+        raise ValueError(f'Unknown compression codec {codec!r}.') from None
+
+def decode(blob):
+    """Decompress a blob written by :meth:`Codec.encode`, whichever codec it was written with."""
+
+    codec_id = blob[0]
+
+    if codec_id == _ZLIB_HEADER:
+        return zlib.decompress(blob)
+
+    decoder = _DECODERS.get(codec_id)
+    if decoder is None:
+        for i in _CODECS.values():
+            if i.id == codec_id:
+                decoder = _DECODERS[codec_id] = i()
+                break
+        else:
+            raise ValueError(f'Unknown compression codec id {codec_id}.')
+
+    return decoder.decompress(blob[1:])
@@ -0,0 +1,177 @@
+"""
+JSON decoding of weatherapi responses.
+Responses can be decoded with a faster JSON library when one is installed, and forecasts
+can be decoded a day at a time while they are still being received.
+"""
+
+import functools
+import json
+import re
+
+__all__ = [
+    'JsonBackend',
+    'StdlibBackend',
+    'OrjsonBackend',
+    'UjsonBackend',
+    'get_backend',
+    'iter_forecast'
+]
+
+class JsonBackend:
+    """
+    Abstract class representing a JSON library.
+
+    :var name: Name used to pick the backend with :func:`get_backend`.
+    """
+
+    name = None
+
+    def loads(self, data):
+        """Decode JSON ``data`` bytes."""
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f'{type(self).__name__}()'
+
+class StdlibBackend(JsonBackend):
+    """The standard library's ``json``."""
+
+    name = 'json'
+
+    def loads(self, data):
+        return json.loads(data)
+
+class OrjsonBackend(JsonBackend):
+    """``orjson``. Requires the ``orjson`` package."""
+
+    name = 'orjson'
+
+    def __init__(self):
+        import orjson # Optional dependency
+
+        self.loads = orjson.loads
+
+class UjsonBackend(JsonBackend):
+    """``ujson``. Requires the ``ujson`` package."""
+
+    name = 'ujson'
+
+    def __init__(self):
+        import ujson # Optional dependency
+
+        # Before ujson 4, floats are rounded differently from `json` unless `precise_float`
+        # is set. Later versions always parse them precisely, and reject the option.
+        try:
+            ujson.loads(b'0.1', precise_float=True)
+        except TypeError:
+            self.loads = ujson.loads
+        else:
+            self.loads = functools.partial(ujson.loads, precise_float=True)
+
+# ---------------------------
+
+_BACKENDS = {i.name: i for i in (StdlibBackend, OrjsonBackend, UjsonBackend)}
+_AUTO = (OrjsonBackend, UjsonBackend, StdlibBackend) # Fastest first
+
+def get_backend(backend='auto'):
+    """
+    Get a JSON backend.
+
+    :param backend: A :class:`JsonBackend`, or the name of one (``'json'``, ``'orjson'``
+        or ``'ujson'``). ``'auto'`` picks the fastest one installed, and ``None`` is the same as ``'json'``.
+    :raises ValueError: If there is no backend with that name.
+    :raises ImportError: If the backend's library isn't installed.
+    :rtype: :class:`JsonBackend`
+    """
+
+    if isinstance(backend, JsonBackend):
+        return backend
+
+    if backend == 'auto':
+        for i in _AUTO:
+            try:
+                return i()
+            except ImportError:
+                pass
+
+    try:
+        return _BACKENDS[backend or 'json']()
+    except KeyError:
+        raise ValueError(f'Unknown JSON backend {backend!r}.') from None
+
+# Streaming -----------------
+# A forecast is `{"location": ..., "current": ..., "forecast": {"forecastday": [day, ...]}}`,
+# where days make up almost all of it. Received bytes are scanned for brackets, skipping over
+# strings, which is all that's needed to know where each day starts and ends. Every day is
+# then decoded on its own, so the whole response is never decoded at once.
+
+# Anything up to the next bracket, skipping whole strings. Ends at a quote instead if a
+# string hasn't been received entirely.
+_BRACKET = re.compile(rb'[^"{}\[\]]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"{}\[\]]*)*([{}\[\]"])', re.DOTALL)
+_DAYS_KEY = re.compile(rb'(?<!\\)"forecastday"\s*:\s*$')
+
+def iter_forecast(chunks, backend=None):
+    """
+    Decode a forecast or history response while it is received.
+
+    :param chunks: Iterable of the response's body, in bytes chunks.
+    :param backend: :class:`JsonBackend` to decode with. See :func:`get_backend`.
+
+    :returns: A generator, first yielding the response without its days, as soon as those
+        have all been received, and then each of ``forecast.forecastday`` as soon as it has been
+        received. If the response isn't a forecast, such as an error, it is yielded whole.
+    :raises ValueError: If the response isn't valid JSON, or ends early.
+    """
+
+    loads = get_backend(backend).loads
+    match = _BRACKET.match
+
+    buf = b''
+    pos = 0 # Scanned up to here
+    depth = 0
+    days = False # Whether the days have been reached
+    day = None # Offset of the current day in `buf`
+
+    for chunk in chunks:
+        buf += chunk
+
+        while True:
+            found = match(buf, pos)
+            if found is None or found.group(1) == b'"': # Wait for the rest of the string
+                break
+
+            bracket = found.group(1)
+            start = found.start(1)
+            pos = found.end()
+
+            if bracket in b'{[':
+                depth += 1
+
+                if days and depth == 4:
+                    day = start
+                elif not days and depth == 3 and bracket == b'[' and _DAYS_KEY.search(buf, 0, start):
+                    days = True
+                    # Close what's open around the days, which is only the forecast and the response
+                    yield loads(buf[:pos] + b']}}')
+            else:
+                depth -= 1
+
+                if days and depth == 3 and day is not None:
+                    yield loads(buf[day:pos])
+                    day = None
+                elif days and depth == 2:
+                    return # The rest of the response isn't needed
+
+        if day is not None:
+            # Only keep what hasn't been decoded yet
+            buf = buf[day:]
+            pos -= day
+            day = 0
+        elif days:
+            buf = buf[pos:]
+            pos = 0
+
+    if days:
+        raise ValueError('Response ended before all days were received.')
+
+    yield loads(buf) # Not a forecast
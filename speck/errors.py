@@ -16,7 +16,8 @@ __all__ = [
     'QueryNotProvided',
     'InvalidRequestUrl',
     'InvalidLocation',
-    'InternalError'
+    'InternalError',
+    'RateLimited'
 ]
 
 class WeatherApiError(Exception):
@@ -57,3 +58,6 @@ class InvalidLocation(WeatherApiError):
 
 class InternalError(WeatherApiError):
     """Raised when an internal weatherapi error is encountered."""
+
+class RateLimited(WeatherApiError):
+    """Raised when a request is refused by the client side rate limiter."""
@@ -0,0 +1,211 @@
+"""
+Request metrics and tracing hooks.
+Observers passed to a :class:`client.Client` are told about every request it handles.
+"""
+
+import os
+import threading
+
+from bisect import bisect_left
+
+__all__ = [
+    'RequestEvent',
+    'Observer',
+    'PrometheusObserver'
+]
+
+class RequestEvent:
+    """
+    Everything known about a single client request. Timings are in seconds.
+
+    :var endpoint: weatherapi endpoint, such as ``'current'`` or ``'forecast'``.
+    :var key: Cache name of the request.
+    :var cache: How cache was used. ``'hit'`` if fresh cache was returned, ``'stale'`` if
+        outdated cache was returned, ``'miss'`` if a request was made to weatherapi, and
+        ``'coalesced'`` if an identical request that was already in flight was waited for.
+        ``'revalidate'`` marks background updates of stale cache. ``None`` if the request failed
+        before it got that far, such as when cache couldn't be read.
+    :var status: HTTP status code, or ``None`` if no request was made.
+    :var bytes: Size of the response body in bytes.
+    :var timings: HTTP timings, with ``dns`` and ``connect`` (both ``0`` if a pooled connection
+        was reused), ``ttfb`` (until the response headers arrived) and ``total`` (until the whole
+        body arrived). Empty if no request was made.
+    :var decode: Time spent decoding the JSON response.
+    :var parse: Time spent converting the response into `types` objects.
+    :var duration: Total time spent handling the request.
+    :var error: Class of the exception raised, or ``None``.
+    """
+
+    __slots__ = ('endpoint', 'key', 'cache', 'status', 'bytes', 'timings', 'decode', 'parse', 'duration', 'error')
+
+    def __init__(self, endpoint, key, cache=None):
+        self.endpoint = endpoint
+        self.key = key
+        self.cache = cache
+        self.status = None
+        self.bytes = 0
+        self.timings = {}
+        self.decode = 0.0
+        self.parse = 0.0
+        self.duration = 0.0
+        self.error = None
+
+    def __repr__(self):
+        return f'<RequestEvent {self.endpoint} {self.key!r} cache={self.cache} status={self.status}>'
+
+class Observer:
+    """
+    Abstract class representing a request observer. Override whichever hooks are needed.
+
+    Hooks are called on the thread handling the request, and must not raise.
+    """
+
+    def request_started(self, event):
+        """Called before a request is handled. Only ``endpoint`` and ``key`` are known at this point."""
+        return None
+
+    def request_finished(self, event):
+        """Called after a request has been handled, successfully or not."""
+        return None
+
+# Prometheus ---------------
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(names, values, **extra):
+    pairs = list(zip(names, values)) + list(extra.items())
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for (k, v) in pairs) + '}' if pairs else ''
+
+class _Counter:
+    def __init__(self, name, doc, labels):
+        self.name = name
+        self.doc = doc
+        self.labels = labels
+        self.values = {}
+
+    def inc(self, labels, value=1):
+        self.values[labels] = self.values.get(labels, 0) + value
+
+    def render(self, out):
+        out.append(f'# HELP {self.name} {self.doc}')
+        out.append(f'# TYPE {self.name} counter')
+
+        for (labels, value) in sorted(self.values.items()):
+            out.append(f'{self.name}{_labels(self.labels, labels)} {value}')
+
+class _Histogram:
+    def __init__(self, name, doc, labels, buckets):
+        self.name = name
+        self.doc = doc
+        self.labels = labels
+        self.buckets = buckets
+        self.values = {} # labels -> [bucket counts..., sum]
+
+    def observe(self, labels, value):
+        counts = self.values.get(labels)
+        if counts is None:
+            counts = self.values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def render(self, out):
+        out.append(f'# HELP {self.name} {self.doc}')
+        out.append(f'# TYPE {self.name} histogram')
+
+        for (labels, counts) in sorted(self.values.items()):
+            total = 0
+            for (bound, count) in zip(list(self.buckets) + ['+Inf'], counts):
+                total += count
+                out.append(f'{self.name}_bucket{_labels(self.labels, labels, le=bound)} {total}')
+
+            out.append(f'{self.name}_sum{_labels(self.labels, labels)} {counts[-1]}')
+            out.append(f'{self.name}_count{_labels(self.labels, labels)} {total}')
+
+class PrometheusObserver(Observer):
+    """
+    Aggregates request metrics in-process, and exports them in the Prometheus text format.
+    Safe to share across clients and threads.
+
+    :param prefix: Prefix of every metric name.
+    :param buckets: Upper bounds in seconds of latency histogram buckets.
+    """
+
+    BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    def __init__(self, prefix='speck', buckets=BUCKETS):
+        self._lock = threading.Lock()
+
+        self._requests = _Counter(
+            f'{prefix}_requests_total', 'Requests handled, by endpoint and cache outcome.', ('endpoint', 'cache')
+        )
+        self._errors = _Counter(
+            f'{prefix}_errors_total', 'Requests that raised an error, by endpoint and error class.', ('endpoint', 'error')
+        )
+        self._responses = _Counter(
+            f'{prefix}_http_responses_total', 'HTTP responses from weatherapi, by endpoint and status code.',
+            ('endpoint', 'status')
+        )
+        self._bytes = _Counter(
+            f'{prefix}_http_response_bytes_total', 'Bytes received from weatherapi, by endpoint.', ('endpoint',)
+        )
+        self._duration = _Histogram(
+            f'{prefix}_request_duration_seconds', 'Total time spent handling requests, by endpoint.',
+            ('endpoint',), buckets
+        )
+        self._http = _Histogram(
+            f'{prefix}_http_duration_seconds', 'HTTP request timings, by endpoint and phase.',
+            ('endpoint', 'phase'), buckets
+        )
+        self._parse = _Histogram(
+            f'{prefix}_parse_duration_seconds', 'Time spent decoding and parsing responses, by endpoint and step.',
+            ('endpoint', 'step'), buckets
+        )
+
+    def request_finished(self, event):
+        with self._lock:
+            self._requests.inc((event.endpoint, event.cache or 'error'))
+            self._duration.observe((event.endpoint,), event.duration)
+
+            if event.error is not None:
+                self._errors.inc((event.endpoint, event.error.__name__))
+
+            if event.status is not None:
+                self._responses.inc((event.endpoint, event.status))
+                self._bytes.inc((event.endpoint,), event.bytes)
+
+                for (phase, seconds) in event.timings.items():
+                    self._http.observe((event.endpoint, phase), seconds)
+
+                self._parse.observe((event.endpoint, 'decode'), event.decode)
+                self._parse.observe((event.endpoint, 'parse'), event.parse)
+
+    def render(self):
+        """
+        Export the metrics collected so far.
+
+        :returns: Metrics in the Prometheus text format.
+        :rtype: :class:`str`
+        """
+
+        out = []
+
+        with self._lock:
+            for i in (self._requests, self._errors, self._responses, self._bytes, self._duration, self._http, self._parse):
+                i.render(out)
+
+        return '\n'.join(out) + '\n'
+
+    def write(self, path):
+        """
+        Export the metrics collected so far into a file, for example for the node exporter's
+        textfile collector. The file is replaced atomically, so it is never read half written.
+        """
+
+        tmp = f'{path}.{os.getpid()}.tmp'
+
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(self.render())
+
+        os.replace(tmp, path)
@@ -0,0 +1,155 @@
+"""
+Client side rate limiting.
+Paces requests so that weatherapi.com quotas aren't exceeded.
+"""
+
+import threading
+import time
+
+from datetime import datetime as dt
+
+from . import errors
+
+__all__ = [
+    'TokenBucket',
+    'RateLimiter'
+]
+
+class TokenBucket:
+    """
+    Token bucket. Holds up to ``capacity`` tokens, refilled at ``rate`` tokens per second.
+    Not thread safe by itself, see :class:`RateLimiter`.
+
+    :param rate: Tokens added per second.
+    :param capacity: Maximum number of tokens, i.e. the largest allowed burst.
+        Defaults to ``rate``.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1, rate)
+
+        self._tokens = self.capacity
+        self._stamp = time.monotonic()
+
+    def take(self):
+        """
+        Take a token if one is available.
+
+        :returns: ``0`` if a token was taken, otherwise the number of seconds
+            until one is available.
+        """
+
+        now = time.monotonic()
+
+        self._tokens = min(self.capacity, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0
+
+        return (1 - self._tokens) / self.rate
+
+class RateLimiter:
+    """
+    Request rate limiter and monthly quota governor. Safe to share across threads, including
+    the worker threads an :class:`async_client.AsyncClient` makes its requests on.
+
+    :param per_second: Sustained requests allowed per second, or ``None`` for no limit.
+    :param burst: Requests allowed at once before being paced. Defaults to ``per_second``.
+    :param per_month: Requests allowed per calendar month, or ``None`` for no limit.
+        This should match the weatherapi.com plan's monthly quota.
+    :param block: Wait until a request is allowed. If ``False``, :class:`errors.RateLimited`
+        is raised instead.
+    :param low_budget: Fraction of the monthly budget below which :meth:`budget_low`
+        is ``True``. The client prefers stale cache over new requests then.
+    :param used: Requests already made this month, e.g. from the weatherapi dashboard.
+    """
+
+    def __init__(self, per_second=None, burst=None, per_month=None, block=True, low_budget=0.1, used=0):
+        self.per_month = per_month
+        self.block = block
+        self.low_budget = low_budget
+
+        self._bucket = TokenBucket(per_second, burst) if per_second else None
+        self._lock = threading.Lock()
+
+        self._used = used
+        self._month = RateLimiter.__this_month()
+
+    @staticmethod
+    def __this_month():
+        now = dt.now()
+        return (now.year, now.month)
+
+    def __try_acquire(self):
+        """
+        Take a request from the budget if possible.
+
+        :returns: ``0`` if allowed, otherwise the number of seconds to wait.
+        """
+
+        with self._lock:
+            month = RateLimiter.__this_month()
+            if month != self._month: # Quotas reset every month
+                self._month = month
+                self._used = 0
+
+            if self.per_month is not None and self._used >= self.per_month:
+                raise errors.RateLimited('Monthly request budget has been used up.', 0)
+
+            wait = self._bucket.take() if self._bucket else 0
+            if wait == 0:
+                self._used += 1
+
+            return wait
+
+    def acquire(self, block=None):
+        """
+        Wait for permission to make a request.
+
+        :param block: Overrides ``block`` for this call.
+        :raises errors.RateLimited: If not blocking and the request rate is exceeded,
+            or if the monthly budget is used up.
+        """
+
+        block = self.block if block is None else block
+
+        while True:
+            wait = self.__try_acquire()
+            if wait == 0:
+                return
+
+            if not block:
+                raise errors.RateLimited(f'Request rate exceeded, retry in {wait:.2f}s.', 0)
+
+            time.sleep(wait)
+
+    def exhaust(self):
+        """Mark the monthly budget as used up, e.g. when weatherapi reports the quota is exceeded."""
+
+        with self._lock:
+            if self.per_month is not None:
+                self._used = max(self._used, self.per_month)
+
+    def remaining(self):
+        """
+        Requests left in this month's budget.
+
+        :returns: The number of requests, or ``None`` if there is no monthly limit.
+        """
+
+        if self.per_month is None:
+            return None
+
+        with self._lock:
+            if RateLimiter.__this_month() != self._month:
+                return self.per_month
+            return max(0, self.per_month - self._used)
+
+    def budget_low(self):
+        """Whether less than ``low_budget`` of the monthly budget is left."""
+
+        remaining = self.remaining()
+        return remaining is not None and remaining < self.per_month * self.low_budget
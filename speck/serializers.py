@@ -0,0 +1,284 @@
+"""
+Cache serializers.
+Cache managers use these to convert cached objects into bytes and back.
+"""
+
+import json
+import pickle
+import struct
+
+from datetime import datetime as dt
+
+from . import types
+
+__all__ = [
+    'Serializer',
+    'PickleSerializer',
+    'JsonSerializer',
+    'RawSerializer',
+    'MsgpackSerializer',
+    'PackedSerializer'
+]
+
+class Serializer:
+    """
+    Abstract class representing a serializer.
+
+    :var typed: Whether `types` objects are loaded back as the same objects. Cache of a
+        :class:`client.Client` is made of these, unless it caches raw responses.
+    :var binary: Whether ``bytes``, such as raw responses, are loaded back as ``bytes``.
+    """
+
+    typed = False
+    binary = False
+
+    def dumps(self, data):
+        """Convert ``data`` into bytes."""
+        raise NotImplementedError
+
+    def loads(self, blob):
+        """Convert bytes back into an object."""
+        raise NotImplementedError
+
+class PickleSerializer(Serializer):
+    """
+    Serializes any picklable object with ``pickle``.
+
+    :param protocol: Pickle protocol to use. Defaults to 5, or the highest available.
+    """
+
+    typed = True
+    binary = True
+
+    def __init__(self, protocol=None):
+        self.protocol = protocol or min(5, pickle.HIGHEST_PROTOCOL)
+
+    def dumps(self, data):
+        return pickle.dumps(data, protocol=self.protocol)
+
+    def loads(self, blob):
+        return pickle.loads(blob)
+
+class JsonSerializer(Serializer):
+    """
+    Serializes JSON compatible data, such as raw weatherapi responses, as compact JSON.
+    `types` objects aren't JSON compatible.
+    """
+
+    def dumps(self, data):
+        return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+    def loads(self, blob):
+        return json.loads(blob)
+
+class RawSerializer(Serializer):
+    """
+    Stores ``bytes`` as they are.
+    """
+
+    binary = True
+
+    def dumps(self, data):
+        return bytes(data)
+
+    def loads(self, blob):
+        return bytes(blob)
+
+class MsgpackSerializer(Serializer):
+    """
+    Serializes JSON compatible data and ``bytes`` with ``msgpack``, which must be installed.
+    `types` objects aren't JSON compatible.
+    """
+
+    binary = True
+
+    def __init__(self):
+        import msgpack # Optional dependency
+        self._msgpack = msgpack
+
+    def dumps(self, data):
+        return self._msgpack.packb(data, use_bin_type=True)
+
+    def loads(self, blob):
+        return self._msgpack.unpackb(blob, raw=False)
+
+# Packed format ------------
+#
+# Every value starts with a one byte tag, followed by its contents:
+# - `N`, `T`, `F`: `None`, `True`, `False`
+# - `i`: 64 bit integer
+# - `f`: 64 bit float
+# - `s`, `b`: length, then utf-8 encoded string or bytes
+# - `S`: index of a string seen earlier, since attribute names and such repeat a lot
+# - `l`, `t`: length, then that many values for a list or tuple
+# - `d`: length, then that many key-value pairs
+# - `D`: naive `datetime`
+# - `O`: class id from `_CLASSES`, then the object's attributes as a `d` value
+# - `R`: index of an `O` value seen earlier, for objects referenced more than once
+# - `P`: length, then a pickle, for anything else
+
+_LEN = struct.Struct('<I')
+_INT = struct.Struct('<q')
+_FLOAT = struct.Struct('<d')
+_DATETIME = struct.Struct('<HBBBBBI')
+
+# Ids are stored in the cache. Add new classes at the end.
+_CLASSES = [
+    types.Location,
+    types.HourlyPoint,
+    types.DayPoint,
+    types.AstroPoint,
+    types.DailyPoint,
+    types.IpPoint,
+    types.SportsPoint,
+    types.Km,
+    types.Mm,
+    types.Mb,
+    types.Cel
+]
+_CLASS_IDS = {j: i for i, j in enumerate(_CLASSES)}
+
+class PackedSerializer(Serializer):
+    """
+    Serializes `types` objects, and containers of them, into a compact binary format
+    built with ``struct``. Anything else is pickled.
+    """
+
+    typed = True
+    binary = True
+
+    def dumps(self, data):
+        out = []
+        self.__pack(data, out, {}, {})
+        return b''.join(out)
+
+    def loads(self, blob):
+        return self.__unpack(memoryview(blob), 0, [], [])[0]
+
+    def __pack(self, data, out, memo, strings):
+        """Append the packed form of ``data`` to ``out``."""
+
+        kind = type(data)
+
+        if data is None:
+            out.append(b'N')
+        elif kind is bool:
+            out.append(b'T' if data else b'F')
+        elif kind is int and -(1 << 63) <= data < (1 << 63):
+            out.append(b'i' + _INT.pack(data))
+        elif kind is float:
+            out.append(b'f' + _FLOAT.pack(data))
+        elif kind is str:
+            if data in strings:
+                out.append(b'S' + _LEN.pack(strings[data]))
+                return
+
+            strings[data] = len(strings)
+            raw = data.encode('utf-8')
+            out.append(b's' + _LEN.pack(len(raw)) + raw)
+        elif kind is bytes:
+            out.append(b'b' + _LEN.pack(len(data)) + data)
+        elif kind is list or kind is tuple:
+            out.append((b'l' if kind is list else b't') + _LEN.pack(len(data)))
+            for i in data:
+                self.__pack(i, out, memo, strings)
+        elif kind is dict:
+            out.append(b'd' + _LEN.pack(len(data)))
+            for k, v in data.items():
+                self.__pack(k, out, memo, strings)
+                self.__pack(v, out, memo, strings)
+        elif kind is dt and data.tzinfo is None:
+            out.append(b'D' + _DATETIME.pack(
+                data.year, data.month, data.day, data.hour, data.minute, data.second, data.microsecond
+            ))
+        elif kind in _CLASS_IDS:
+            if id(data) in memo:
+                out.append(b'R' + _LEN.pack(memo[id(data)]))
+                return
+
+            memo[id(data)] = len(memo)
+            out.append(b'O' + bytes((_CLASS_IDS[kind],)))
+            self.__pack(data.__getstate__(), out, memo, strings)
+        else:
+            raw = pickle.dumps(data, protocol=min(5, pickle.HIGHEST_PROTOCOL))
+            out.append(b'P' + _LEN.pack(len(raw)) + raw)
+
+    def __unpack(self, blob, offset, memo, strings):
+        """
+        Unpack the value at ``offset``.
+
+        :returns: ``(value, offset after the value)``
+        """
+
+        tag = blob[offset]
+        offset += 1
+
+        if tag == 78: # N
+            return (None, offset)
+        if tag == 84: # T
+            return (True, offset)
+        if tag == 70: # F
+            return (False, offset)
+        if tag == 105: # i
+            return (_INT.unpack_from(blob, offset)[0], offset + _INT.size)
+        if tag == 102: # f
+            return (_FLOAT.unpack_from(blob, offset)[0], offset + _FLOAT.size)
+
+        if tag in (115, 98, 80): # s, b, P
+            size = _LEN.unpack_from(blob, offset)[0]
+            offset += _LEN.size
+            raw = blob[offset:offset + size]
+
+            if tag == 115:
+                value = str(raw, 'utf-8')
+                strings.append(value)
+            elif tag == 98:
+                value = bytes(raw)
+            else:
+                value = pickle.loads(raw)
+
+            return (value, offset + size)
+
+        if tag in (108, 116): # l, t
+            size = _LEN.unpack_from(blob, offset)[0]
+            offset += _LEN.size
+
+            items = []
+            for _ in range(size):
+                (value, offset) = self.__unpack(blob, offset, memo, strings)
+                items.append(value)
+
+            return (items if tag == 108 else tuple(items), offset)
+
+        if tag == 100: # d
+            size = _LEN.unpack_from(blob, offset)[0]
+            offset += _LEN.size
+
+            items = {}
+            for _ in range(size):
+                (key, offset) = self.__unpack(blob, offset, memo, strings)
+                (items[key], offset) = self.__unpack(blob, offset, memo, strings)
+
+            return (items, offset)
+
+        if tag == 68: # D
+            return (dt(*_DATETIME.unpack_from(blob, offset)), offset + _DATETIME.size)
+
+        if tag == 79: # O
+            cls = _CLASSES[blob[offset]]
+
+            obj = cls.__new__(cls)
+            memo.append(obj) # Before unpacking attributes, in file order
+
+            (state, offset) = self.__unpack(blob, offset + 1, memo, strings)
+            obj.__setstate__(state)
+
+            return (obj, offset)
+
+        if tag == 82: # R
+            return (memo[_LEN.unpack_from(blob, offset)[0]], offset + _LEN.size)
+
+        if tag == 83: # S
+            return (strings[_LEN.unpack_from(blob, offset)[0]], offset + _LEN.size)
+
+        raise ValueError(f'Invalid packed data at offset {offset - 1}.')
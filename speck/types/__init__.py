@@ -4,3 +4,4 @@ Utility types to hold weatherapi information.
 
 from .raw import *
 from .data_point import *
+from .columns import *
@@ -0,0 +1,91 @@
+"""
+Columnar views of hourly weather data, as NumPy arrays.
+Requires ``numpy``, which is an optional dependency: ``pip install speck-wrapper[numpy]``.
+"""
+
+from . import raw
+
+__all__ = [
+    'HOURLY_COLUMNS',
+    'hour_columns'
+]
+
+# Numeric fields of an hour, by their name in `weatherapi` responses and `HourlyPoint`s.
+HOURLY_COLUMNS = (
+    'temp_c', 'feelslike_c', 'windchill_c', 'heatindex_c', 'dewpoint_c',
+    'wind_kph', 'gust_kph', 'wind_degree', 'pressure_mb', 'precip_mm',
+    'humidity', 'cloud', 'uv', 'vis_km', 'is_day',
+    'will_it_rain', 'will_it_snow', 'chance_of_rain', 'chance_of_snow'
+)
+
+# Sent as strings by weatherapi
+_STRING_COLUMNS = ('chance_of_rain', 'chance_of_snow')
+
+def _point_row(point):
+    """The fields of a built `HourlyPoint`, as they are in a `weatherapi` response."""
+
+    row = {}
+
+    for i in HOURLY_COLUMNS:
+        value = getattr(point, i)
+        row[i] = value.val if isinstance(value, raw._Unit) else value
+
+    row['time'] = point.time.isoformat(' ', 'minutes') if point.time else None
+    return row
+
+def _rows(days):
+    """Raw data of every hour in ``days``."""
+
+    if isinstance(days, dict): # A whole response
+        days = days['forecast']['forecastday']
+
+    for day in days:
+        if isinstance(day, dict):
+            yield from day['hour']
+            continue
+
+        for i in day.hour:
+            try:
+                (args, kwargs) = object.__getattribute__(i, '_lazy')
+            except AttributeError: # Built already
+                yield _point_row(i)
+                continue
+
+            # Lazy points made by `from_raw` still hold their raw data, as keyword arguments.
+            # Those given their fields as positional arguments are built instead.
+            yield kwargs if len(args) <= 1 else _point_row(i)
+
+def _float(value):
+    return float(value) if value is not None else None
+
+def hour_columns(days):
+    """
+    Get every hour of some days as columns, one contiguous array per field. Raw data is
+    read directly, without building :class:`HourlyPoint`\\s that haven't been built yet.
+
+    Columns of many locations can be compared by passing the days of all of them, in
+    which case there are ``24`` rows per day, in order.
+
+    :param days: Either a forecast or history response from `weatherapi`, converted from
+        json, a list of its ``forecastday``\\s, or a list of :class:`DailyPoint`\\s.
+
+    :returns: A :class:`numpy.ndarray` of :class:`float`\\s for every field in ``HOURLY_COLUMNS``,
+        with ``nan`` where a value is missing, and ``time`` with ``datetime64[m]`` local times.
+    :rtype: dict[:class:`str`, :class:`numpy.ndarray`]
+    :raises ImportError: If ``numpy`` isn't installed.
+    """
+
+    import numpy as np # Optional dependency
+
+    rows = list(_rows(days))
+    columns = {'time': np.array([i.get('time') for i in rows], dtype='datetime64[m]')}
+
+    for name in HOURLY_COLUMNS:
+        if name in _STRING_COLUMNS:
+            values = [_float(i.get(name)) for i in rows]
+        else:
+            values = [i.get(name) for i in rows]
+
+        columns[name] = np.array(values, dtype=np.float64) # `None` becomes `nan`
+
+    return columns
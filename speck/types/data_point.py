@@ -4,9 +4,13 @@ WeatherAPI types.
 
 import json
 import pickle
+import threading
+import weakref
 from datetime import datetime as dt
+from functools import lru_cache
+from operator import attrgetter
 
-from . import raw
+from . import columns, raw
 
 __all__ = [
     'Location',
@@ -18,13 +22,83 @@ __all__ = [
     'SportsPoint'
 ]
 
-class BasePoint:
+# Lazy points ---------------
+# A lazy point only keeps the arguments it was created with, and runs `__init__` with them
+# when one of its attributes is first read. `__getattr__` is only called for attributes
+# that aren't set, so materialized points are as fast as any other object.
+#
+# Points keep their attributes in `__slots__`, see `raw`, which is also what keeps them
+# pickling the same way as before they had slots.
+
+_LAZY_LOCK = threading.RLock() # Points can be shared between threads, e.g. through cache
+_GETTERS = {} # Class -> (attributes, getter of all of them), for pickling built points
+
+class _LazyPoint(raw._Slotted):
+    """Mixin allowing a point to be built on first use."""
+
+    __slots__ = ('_lazy',)
+
+    @classmethod
+    def lazy(cls, *args, **kwargs):
+        """Return new instance of child, built from ``args`` only when one of its attributes is first read."""
+        return cls._deferred(args, kwargs)
+
+    @classmethod
+    def _deferred(cls, args, kwargs):
+        """Like :meth:`lazy`, without copying ``kwargs``, which must not be changed afterwards."""
+
+        self = cls.__new__(cls)
+        self._lazy = (args, kwargs)
+        return self
+
+    def __getattr__(self, name):
+        if name.startswith('__') or name == '_lazy':
+            raise AttributeError(name)
+
+        with _LAZY_LOCK:
+            try:
+                args = self._lazy
+            except AttributeError:
+                args = None # Already built, by another thread
+
+            if args is not None:
+                del self._lazy
+                try:
+                    self.__init__(*args[0], **args[1])
+                except BaseException:
+                    self._lazy = args
+                    raise
+
+        return object.__getattribute__(self, name)
+
+    def __getstate__(self):
+        try:
+            object.__getattribute__(self, '_lazy')
+        except AttributeError: # Built, so every attribute is set
+            try:
+                (names, getter) = _GETTERS[type(self)]
+            except KeyError:
+                names = tuple(i for i in raw._slot_names(type(self)) if i != '_lazy')
+                (names, getter) = _GETTERS[type(self)] = (names, attrgetter(*names))
+
+            return dict(zip(names, getter(self)))
+
+        return super().__getstate__()
+
+class BasePoint(_LazyPoint):
     """Abstract class representing a single data point."""
+
+    __slots__ = ()
+
     @classmethod
-    def from_raw(cls, data):
-        """Return new instance of child from json converted `weatherapi` response."""
+    def from_raw(cls, data, lazy=False):
+        """
+        Return new instance of child from json converted `weatherapi` response.
+
+        :param lazy: Only convert ``data`` when the instance is first used.
+        """
         # Unpacking uses the dict's keys as keyword arguments
-        return cls(**data)
+        return cls._deferred((), data) if lazy else cls(**data)
 
     @classmethod
     def from_json(cls, data):
@@ -35,12 +109,20 @@ class BasePoint:
         """Return a bytes-like object."""
         return pickle.dumps(self)
 
-class BasePointLoc:
+class BasePointLoc(_LazyPoint):
     """``BasePoint`` with extra location parameter."""
+
+    __slots__ = ()
+
     @classmethod
-    def from_raw(cls, location, data):
-        """Return new instance of child from json converted `weatherapi` response."""
-        return cls(location, **data) # Unpacking uses the dict's keys are keyword arguments
+    def from_raw(cls, location, data, lazy=False):
+        """
+        Return new instance of child from json converted `weatherapi` response.
+
+        :param lazy: Only convert ``data`` when the instance is first used.
+        """
+        # Unpacking uses the dict's keys are keyword arguments
+        return cls._deferred((location,), data) if lazy else cls(location, **data)
 
     @classmethod
     def from_json(cls, location, data):
@@ -53,9 +135,35 @@ class BasePointLoc:
 
 # Inheritance only to implement `from_raw` and `from_json` automatically for all subclasses
 
+# Times ---------------------
+# `strptime` is slow, and is called for every point. weatherapi always sends times in the
+# same format, which `fromisoformat` parses much faster. Anything else, such as hours that
+# aren't zero padded, is left to `strptime`. Forecasts for many places share their hours,
+# so times are also memoized, which is safe since `datetime`s are immutable.
+
+@lru_cache(maxsize=4096)
+def _parse_time(text):
+    """Parse a weatherapi time such as ``2021-04-16 17:45``. The same as ``strptime(text, "%Y-%m-%d %H:%M")``."""
+
+    if len(text) == 16 and text[4] == '-' and text[7] == '-' and text[10] == ' ' and text[13] == ':':
+        try:
+            return dt.fromisoformat(text)
+        except ValueError:
+            pass
+
+    return dt.strptime(text, "%Y-%m-%d %H:%M")
+
+# ---------------------------
+
+# Locations built from raw data, by that data. Every point in a response, and responses
+# about the same place at the same time, share a location instead of parsing it again.
+_LOCATIONS = weakref.WeakValueDictionary()
+_LOCATIONS_LOCK = threading.Lock()
+
 class Location(BasePoint):
     """
     Represents location data such as coordinates, time zone, region, at a particular time.
+    Locations created with :meth:`from_raw` are shared, and should not be modified.
 
     :var lat: :class:`float`
     :var lon: :class:`float`
@@ -64,6 +172,9 @@ class Location(BasePoint):
     :var tz_id: :class:`str`
     :var localtime: :class:`datetime.datetime`
     """
+
+    __slots__ = ('lat', 'lon', 'name', 'region', 'country', 'tz_id', 'localtime', '__weakref__')
+
     def __init__(self,
         lat, lon, name, region=None, country=None, tz_id=None, localtime=None,
         **kwargs
@@ -74,7 +185,36 @@ class Location(BasePoint):
         self.region = region
         self.country = country
         self.tz_id = tz_id
-        self.localtime = dt.strptime(localtime, "%Y-%m-%d %H:%M") if localtime else None
+        self.localtime = _parse_time(localtime) if localtime else None
+
+    @classmethod
+    def from_raw(cls, data, lazy=False):
+        """
+        Return a location from json converted `weatherapi` response. The same instance is
+        returned for the same data, for as long as it is in use.
+
+        :param lazy: Only convert ``data`` when the instance is first used.
+        """
+
+        get = data.get
+        key = (
+            cls, get('name'), get('region'), get('country'),
+            get('lat'), get('lon'), get('tz_id'), get('localtime')
+        )
+
+        try:
+            with _LOCATIONS_LOCK:
+                location = _LOCATIONS.get(key)
+        except TypeError: # Unhashable data, don't bother
+            return super().from_raw(data, lazy)
+
+        if location is None:
+            location = super().from_raw(data, lazy)
+
+            with _LOCATIONS_LOCK:
+                location = _LOCATIONS.setdefault(key, location)
+
+        return location
 
 class HourlyPoint(BasePointLoc):
     """
@@ -104,6 +244,14 @@ class HourlyPoint(BasePointLoc):
     :var uv: :class:`float`
     :var vis_km: :class:`types.Km`
     """
+
+    __slots__ = (
+        'location', 'time', 'temp_c', 'feelslike_c', 'windchill_c', 'heatindex_c', 'dewpoint_c',
+        'condition', 'wind_kph', 'gust_kph', 'wind_degree', 'wind_dir', 'pressure_mb', 'precip_mm',
+        'will_it_rain', 'will_it_snow', 'chance_of_rain', 'chance_of_snow', 'humidity', 'cloud',
+        'is_day', 'uv', 'vis_km'
+    )
+
     def __init__(
         self, location,
         temp_c, feelslike_c,
@@ -123,7 +271,7 @@ class HourlyPoint(BasePointLoc):
         else:
             self.location = Location.from_raw(location)
 
-        self.time = dt.strptime(last_updated if not time else time, "%Y-%m-%d %H:%M") \
+        self.time = _parse_time(last_updated if not time else time) \
                     if (last_updated or time) else None
 
         self.temp_c = raw.Cel(temp_c)
@@ -172,6 +320,12 @@ class DayPoint(BasePointLoc):
     :var avghumidity: :class:`int`
     :var uv: :class:`float`
     """
+
+    __slots__ = (
+        'location', 'maxtemp_c', 'mintemp_c', 'avgtemp_c', 'condition', 'maxwind_kph',
+        'totalprecip_mm', 'avgvis_km', 'avghumidity', 'uv'
+    )
+
     def __init__(
         self, location,
         maxtemp_c, mintemp_c, avgtemp_c, maxwind_kph,
@@ -208,6 +362,9 @@ class AstroPoint(BasePointLoc):
     :var moonset: :class:`str`
     :var moon_phase: :class:`str`
     """
+
+    __slots__ = ('location', 'sunrise', 'sunset', 'moonrise', 'moonset', 'moon_phase')
+
     def __init__(self, location, sunrise, sunset, moonrise, moonset, moon_phase, **kwargs):
         if isinstance(location, Location):
             self.location = location
@@ -226,23 +383,38 @@ class DailyPoint(BasePointLoc):
     """
     All information per day, inlcuding hourly info.
 
+    :param lazy: Build ``day`` and every point in ``hour`` only when they are first used.
+
     :var location: :class:`Location`
     :var day: :class:`DayPoint`
     :var astro: :class:`AstroPoint`
     :var hour: list[:class:`HourlyPoint`]
     """
-    def __init__(self, location, day, astro, hour):
+
+    __slots__ = ('location', 'day', 'astro', 'hour')
+
+    def __init__(self, location, day, astro, hour, lazy=False):
         self.location = location if isinstance(location, Location) else Location.from_raw(location)
 
-        self.day = day if isinstance(day, DayPoint) else DayPoint.from_raw(location, day)
+        self.day = day if isinstance(day, DayPoint) else DayPoint.from_raw(self.location, day, lazy)
 
         self.astro = astro
 
         self.hour = [
-            i if isinstance(i, HourlyPoint) else HourlyPoint.from_raw(location, i)
+            i if isinstance(i, HourlyPoint) else HourlyPoint.from_raw(self.location, i, lazy)
             for i in hour
         ]
 
+    def hour_columns(self):
+        """
+        Get every hour of this day as columns. Hours that haven't been built yet are read
+        from raw data. See :func:`columns.hour_columns`.
+
+        :rtype: dict[:class:`str`, :class:`numpy.ndarray`]
+        :raises ImportError: If ``numpy`` isn't installed.
+        """
+        return columns.hour_columns([self])
+
 class IpPoint(BasePoint):
     """
     IP Address information.
@@ -251,6 +423,9 @@ class IpPoint(BasePoint):
     :var ip: :class:`str`
     :var type: :class:`str`
     """
+
+    __slots__ = ('location', 'ip', 'type')
+
     def __init__(self,
         ip, type,
         country_name,
@@ -273,10 +448,13 @@ class SportsPoint(BasePoint):
     :var start: :class:`datetime.datetime`
     :var match: :class:`str`
     """
+
+    __slots__ = ('stadium', 'country', 'region', 'tournament', 'start', 'match')
+
     def __init__(self, stadium, country, region, tournament, start, match):
         self.stadium = stadium
         self.country = country # / Might wrap in a `Location` object
         self.region = region   # /
         self.tournament = tournament
-        self.start = dt.strptime(start, "%Y-%m-%d %H:%M") if start else None
+        self.start = _parse_time(start) if start else None
         self.match = match
@@ -2,14 +2,17 @@
 Utility classes for easy conversions.
 """
 
-from dataclasses import dataclass
-
-# The use of dataclasses here
-# ---------------------------
-# The dataclasses module provides a decorator and
-# functions for automatically generating special methods
-# such as __repr__() for user-defined classes
-# [docs](https://docs.python.org/3/library/dataclasses.html).
+from dataclasses import dataclass, fields
+
+# Slots
+# -----
+# There can be millions of these in memory at once, so they keep their attributes in
+# `__slots__` instead of a per-instance `__dict__`. They are pickled with a `__dict__`
+# like state, so caches written before they had slots can still be read, and the other
+# way around.
+#
+# The unit classes are dataclasses, which can't have slots along with field defaults
+# before Python 3.10, so they are rebuilt with slots after the dataclass is made.
 
 __all__ = [
     'Km',
@@ -18,8 +21,80 @@ __all__ = [
     'Cel'
 ]
 
-@dataclass()
-class Km:
+_SLOT_NAMES = {}
+
+def _slot_names(cls):
+    """All attributes stored in the slots of ``cls`` and its bases."""
+
+    names = _SLOT_NAMES.get(cls)
+
+    if names is None:
+        names = []
+        for i in reversed(cls.__mro__):
+            slots = i.__dict__.get('__slots__', ())
+            for j in (slots,) if isinstance(slots, str) else slots:
+                if j not in ('__dict__', '__weakref__') and j not in names:
+                    names.append(j)
+
+        names = _SLOT_NAMES[cls] = tuple(names)
+
+    return names
+
+class _Slotted:
+    """Mixin pickling a slotted class with the same state as an unslotted one."""
+
+    __slots__ = ()
+
+    def __getstate__(self):
+        state = {}
+        get = object.__getattribute__ # Not `getattr`, which would build lazy points
+
+        for i in _slot_names(type(self)):
+            try:
+                state[i] = get(self, i)
+            except AttributeError: # Unset
+                pass
+
+        return state
+
+    def __setstate__(self, state):
+        if isinstance(state, tuple): # `(__dict__, slots)`, from the default pickling of slots
+            state = dict(state[0] or {}, **(state[1] or {}))
+
+        set = object.__setattr__
+
+        for (k, v) in state.items():
+            try:
+                set(self, k, v)
+            except AttributeError: # No longer an attribute
+                pass
+
+def _slots(cls):
+    """
+    Rebuild the dataclass ``cls`` with its fields in ``__slots__``,
+    like ``dataclass(slots=True)`` does from Python 3.10 on.
+    """
+
+    names = tuple(i.name for i in fields(cls))
+    body = {k: v for (k, v) in cls.__dict__.items() if k not in names + ('__dict__', '__weakref__')}
+    body['__slots__'] = names # Defaults live on in the generated `__init__`
+
+    return type(cls)(cls.__name__, cls.__bases__, body)
+
+class _Unit(_Slotted):
+    """A value in some unit. Subclasses are dataclasses with a single ``val`` field."""
+
+    __slots__ = ()
+
+    def __reduce__(self):
+        return (self.__class__, (self.val,))
+
+    def __repr__(self):
+        return f"{self.val}"
+
+@_slots
+@dataclass(repr=False)
+class Km(_Unit):
     """Kilometer."""
     val: float = 0
 
@@ -27,11 +102,9 @@ class Km:
         """Equivalent miles."""
         return self.val * 0.6213
 
-    def __repr__(self):
-        return f"{self.val}"
-
-@dataclass()
-class Mm:
+@_slots
+@dataclass(repr=False)
+class Mm(_Unit):
     """Milimeters."""
     val: float = 0
 
@@ -39,11 +112,9 @@ class Mm:
         """Equivalent inches."""
         return self.val * 0.0393
 
-    def __repr__(self):
-        return f"{self.val}"
-
-@dataclass()
-class Mb:
+@_slots
+@dataclass(repr=False)
+class Mb(_Unit):
     """Milibar."""
     val: float = 0
 
@@ -51,11 +122,9 @@ class Mb:
         """Equivalent inches of Hg."""
         return self.val * 0.02952
 
-    def __repr__(self):
-        return f"{self.val}"
-
-@dataclass()
-class Cel:
+@_slots
+@dataclass(repr=False)
+class Cel(_Unit):
     """Celsius."""
     val: float = -273.15
 
@@ -66,6 +135,3 @@ class Cel:
     def kelvin(self):
         """Equivalent farenheit."""
         return self.val + 273.15
-
-    def __repr__(self):
-        return f"{self.val}"
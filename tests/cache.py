@@ -1,4 +1,17 @@
-from speck.cache import BufferedCacheManager, FileCacheManager
+import gc
+import threading
+import time
+import weakref
+
+from speck.cache import (
+    BufferedCacheManager,
+    FileCacheManager,
+    SqliteCacheManager,
+    MmapCacheManager,
+    TieredCacheManager
+)
+from speck.compression import LzmaCodec, ZlibCodec
+from speck.serializers import JsonSerializer, PackedSerializer, RawSerializer
 
 # Utils --------------------
 
@@ -23,21 +36,312 @@ def __test_cleanup(manager):
     manager.cleanup('x-test-*')
     assert list(manager.find_all()) == []
 
+def __test_cleanup_pattern(manager):
+    manager.dump('forecast-paris-3', 1)
+    manager.dump('forecast-paris-7', 2)
+    manager.dump('forecast-parisville-3', 3)
+    manager.dump('current-paris', 4)
+
+    manager.cleanup('forecast-paris-*')
+    assert sorted(manager.find_all()) == ['current-paris', 'forecast-parisville-3']
+
+    # Dumped again after being cleaned up
+    manager.dump('forecast-paris-3', 5)
+    manager.dump('forecast-paris-3', 6)
+    manager.cleanup('forecast-paris-*')
+    assert sorted(manager.find_all()) == ['current-paris', 'forecast-parisville-3']
+
+    manager.cleanup('*-paris*')
+    assert sorted(manager.find_all()) == []
+
+def __test_expiry(manager):
+    manager.dump('x-test-1', [1, 2, 3, 4], ttl=-1)
+    manager.dump('x-test-2', "some-str", ttl=60)
+
+    assert manager.read('x-test-1') is None
+    assert manager.read_entry('x-test-1')[1] == [1, 2, 3, 4]
+    assert manager.read('x-test-2') == "some-str"
+
+    manager.cleanup('x-test-*')
+
 def __test_all(manager):
     __test_dump_read(manager)
     __test_duplicate(manager)
     __test_cleanup(manager)
+    __test_cleanup_pattern(manager)
+    __test_expiry(manager)
+
+def __test_eviction(policy):
+    manager = BufferedCacheManager(max_entries=2, policy=policy)
+
+    manager.dump('x-test-1', 1)
+    manager.dump('x-test-2', 2)
+    manager.read('x-test-1')
+    manager.read('x-test-1')
+    manager.read('x-test-2')
+    manager.dump('x-test-3', 3)
+
+    # `x-test-1` was used less recently, but more frequently than `x-test-2`
+    assert sorted(manager.find_all()) == (['x-test-2', 'x-test-3'] if policy == 'lru' else ['x-test-1', 'x-test-3'])
+    assert manager.evictions == 1
 
 # Tests --------------------
 
 def test_buffered():
     __test_all(BufferedCacheManager())
+    __test_all(BufferedCacheManager(max_entries=10, max_bytes=1024, policy='lfu'))
+
+    # Enough names to be indexed in several buckets
+    manager = BufferedCacheManager()
+    for i in range(3000):
+        manager.dump(f'x-{i % 7}-{i}', i)
+
+    manager.cleanup('x-3-*')
+    manager.cleanup('x-*9')
+    for i in range(0, 3000, 2):
+        manager.cleanup(f'x-{i % 7}-{i}')
+
+    names = [f'x-{i % 7}-{i}' for i in range(1, 3000, 2) if i % 7 != 3 and i % 10 != 9]
+    assert sorted(manager.find_all()) == sorted(names)
+
+    manager.cleanup('x-5-1*')
+    assert sorted(manager.find_all()) == sorted(i for i in names if not i.startswith('x-5-1'))
+
+def test_buffered_eviction():
+    __test_eviction('lru')
+    __test_eviction('lfu')
 
 def test_file():
     __test_all(FileCacheManager('.test-cache'))
+    __test_all(FileCacheManager('.test-cache', compress=False))
+
+    # Damaged files are missing cache
+    manager = FileCacheManager('.test-cache')
+    manager.dump('x-test-1', [1, 2, 3, 4])
+
+    with open('.test-cache/x-test-1.dat', 'r+b') as f:
+        f.truncate(10)
+    assert manager.read_entry('x-test-1') is None
+
+    with open('.test-cache/x-test-1.dat', 'r+b') as f:
+        f.seek(20)
+        f.write(b'damaged')
+    assert manager.read('x-test-1') is None
+
+    manager.cleanup('x-test-*')
+
+def test_serializers():
+    __test_all(BufferedCacheManager(serializer=PackedSerializer()))
+    __test_all(BufferedCacheManager(serializer=JsonSerializer(), compress=False))
+
+def test_codecs():
+    __test_all(BufferedCacheManager(codec='lzma', compress_threshold=0))
+    __test_all(BufferedCacheManager(codec=ZlibCodec(level=1), compress_threshold=0))
+
+    # Cache written with one codec is readable by managers using another
+    FileCacheManager('.test-cache', codec=ZlibCodec(level=9), compress_threshold=0).dump('x-test-1', [1, 2, 3, 4])
+    FileCacheManager('.test-cache', codec=LzmaCodec(), compress_threshold=0).dump('x-test-2', "some-str" * 100)
+    FileCacheManager('.test-cache').dump('x-test-3', "small")
+
+    manager = FileCacheManager('.test-cache', compress=False)
+    assert manager.read('x-test-1') == [1, 2, 3, 4]
+    assert manager.read('x-test-2') == "some-str" * 100
+    assert manager.read('x-test-3') == "small"
+
+    manager.cleanup('x-test-*')
+
+def test_stats():
+    manager = BufferedCacheManager(max_entries=2, compress=False)
+
+    manager.dump('x-test-1', [1, 2, 3, 4])
+    manager.dump('y-test-1', "some-str", ttl=-1)
+    manager.dump('x-test-2', "some-str")
+
+    assert manager.read('x-test-1') is None # Evicted
+    assert manager.read('x-test-2') == "some-str"
+    assert manager.read('y-test-1') is None # Expired
+    manager.stats.record_stale('y-test-1')
+
+    stats = manager.stats.snapshot()
+    assert (stats['hits'], stats['misses'], stats['evictions'], stats['stale']) == (1, 2, 1, 1)
+    assert stats['prefixes']['x']['misses'] == 1
+    assert stats['prefixes']['y']['stale'] == 1
+    assert stats['read_latency']['count'] == 3
+    assert stats['bytes_stored'] == manager.debug_size() > 0
+
+    manager.stats.reset()
+    stats = manager.stats.snapshot()
+    assert (stats['hits'], stats['misses'], stats['dumps']) == (0, 0, 0)
+    assert stats['bytes_stored'] == manager.debug_size()
+
+    for manager in (FileCacheManager('.test-cache'), SqliteCacheManager('.test-sqlite-cache', batch_size=1)):
+        size = manager.debug_size()
+
+        manager.dump('x-test-1', "some-str" * 100)
+        manager.dump('x-test-1', "some-str")
+        assert manager.debug_size() > size
+
+        manager.cleanup('x-test-*')
+        assert manager.debug_size() == size
+
+def test_sqlite():
+    __test_all(SqliteCacheManager('.test-sqlite-cache'))
+    __test_all(SqliteCacheManager('.test-sqlite-cache', batch_size=1))
+
+    # Pending dumps are written when the manager goes away without being closed
+    manager = SqliteCacheManager('.test-sqlite-cache', batch_size=16)
+    manager.dump('x-test-1', [1, 2, 3, 4])
+    ref = weakref.ref(manager)
+    del manager
+    gc.collect()
+    assert ref() is None
+
+    manager = SqliteCacheManager('.test-sqlite-cache')
+    assert manager.read('x-test-1') == [1, 2, 3, 4]
+    manager.cleanup('x-test-*')
+    manager.close()
+
+def test_mmap():
+    manager = MmapCacheManager('.test-mmap-cache')
+    __test_all(manager)
+    manager.close()
+
+    manager = MmapCacheManager('.test-mmap-cache', compact_min=0)
+    manager.dump('x-test-1', [1, 2, 3, 4])
+    manager.dump('x-test-2', "some-str")
+    manager.cleanup('x-test-2')
+    manager.compact()
+    manager.close()
+
+    # Index is rebuilt from the file
+    manager = MmapCacheManager('.test-mmap-cache')
+    assert manager.read('x-test-1') == [1, 2, 3, 4]
+    assert manager.read('x-test-2') is None
+    manager.cleanup('x-test-*')
+
+    # Only one manager at a time
+    try:
+        MmapCacheManager('.test-mmap-cache')
+    except RuntimeError:
+        pass
+    else:
+        assert False
+
+    manager.close()
+
+    # Dumps and cleanups made while compacting are kept
+    manager = MmapCacheManager('.test-mmap-cache', compact_min=0)
+    for i in range(200):
+        manager.dump(f'x-test-{i}', i)
+
+    compactor = threading.Thread(target=manager.compact)
+    compactor.start()
+    for i in range(0, 200, 2):
+        manager.dump(f'x-test-{i}', -i)
+    manager.cleanup('x-test-1*')
+    compactor.join()
+
+    expected = {f'x-test-{i}': -i if i % 2 == 0 else i for i in range(200) if not str(i).startswith('1')}
+    assert {i: manager.read(i) for i in manager.find_all()} == expected
+    manager.close()
+
+    manager = MmapCacheManager('.test-mmap-cache')
+    assert {i: manager.read(i) for i in manager.find_all()} == expected
+
+    # Closing waits for compaction on a background thread
+    manager.compact_min = manager.compact_ratio = 0
+    manager.cleanup('x-test-*')
+    manager.close()
+
+    manager = MmapCacheManager('.test-mmap-cache')
+    assert list(manager.find_all()) == []
+    manager.close()
+
+    # A file left empty is started over
+    open('.test-mmap-cache/cache.mmap', 'wb').close()
+
+    manager = MmapCacheManager('.test-mmap-cache')
+    assert list(manager.find_all()) == []
+    manager.close()
+
+def test_tiered():
+    __test_all(TieredCacheManager('.test-cache'))
+    __test_all(TieredCacheManager('.test-cache', write_behind=False))
+
+    manager = TieredCacheManager('.test-cache', max_entries=1)
+    manager.dump('x-test-1', [1, 2, 3, 4])
+    manager.dump('x-test-2', "some-str")
+    manager.flush()
+
+    # Evicted from memory, but still on disk
+    assert list(manager.front.find_all()) == ['x-test-2']
+    assert manager.read('x-test-1') == [1, 2, 3, 4]
+    assert list(manager.front.find_all()) == ['x-test-1']
+
+    manager.cleanup('x-test-*')
+    manager.flush()
+    assert list(manager.find_all()) == []
+
+    # Raw bytes, such as responses cached by `Client(cache_raw=True)`
+    manager = TieredCacheManager('.test-cache', serializer=RawSerializer(), write_behind=False)
+    manager.dump('x-test-1', b'{"raw": true}')
+    assert manager.front.read('x-test-1') == manager.back.read('x-test-1') == b'{"raw": true}'
+
+    manager.cleanup('x-test-*')
+
+    # Cache cleaned up isn't read from a persistent tier that hasn't caught up yet
+    class SlowManager(BufferedCacheManager):
+        def cleanup(self, name):
+            time.sleep(0.2)
+            super().cleanup(name)
+
+    manager = TieredCacheManager('.test-cache', back=SlowManager())
+    manager.dump('forecast-x-1', 'v')
+    manager.flush()
+    manager.cleanup('forecast-*')
+
+    assert manager.read('forecast-x-1') is None
+    manager.flush()
+    assert manager.read('forecast-x-1') is None
+
+    # Failed writes are counted, and don't stop the writer
+    class FailingManager(BufferedCacheManager):
+        def dump(self, name, data, ttl=None, expires_at=None):
+            if name == 'x-test-1':
+                raise OSError(name)
+            super().dump(name, data, ttl, expires_at)
+
+    manager = TieredCacheManager('.test-cache', back=FailingManager())
+    manager.dump('x-test-1', [1, 2])
+    manager.dump('x-test-2', [1, 2])
+    manager.flush()
+    assert manager.back.read('x-test-2') == [1, 2]
+    assert manager.stats.snapshot()['write_errors'] == 1
+
+    # Closing stops the writer, and later dumps are written right away
+    threads = threading.active_count()
+    manager.close()
+    assert threading.active_count() == threads - 1
+
+    manager.dump('x-test-3', [1, 2])
+    assert manager.back.read('x-test-3') == [1, 2]
+
+    # Managers that aren't closed aren't kept alive
+    manager = TieredCacheManager('.test-cache')
+    ref = weakref.ref(manager)
+    del manager
+    gc.collect()
+    assert ref() is None
 
 # --------------------------
 
 if __name__ == '__main__':
     test_buffered()
+    test_buffered_eviction()
     test_file()
+    test_serializers()
+    test_codecs()
+    test_stats()
+    test_sqlite()
+    test_mmap()
+    test_tiered()
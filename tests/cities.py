@@ -0,0 +1,70 @@
+from speck import cities, client
+
+# Utils --------------------
+
+CITIES = [
+    {'name': name, 'lat': i, 'lon': -i, 'country': 'Somewhere'}
+    for (i, name) in enumerate([
+        'São Paulo', 'Londonderry', 'New  London', 'London', 'East London', 'Ondo', 'Lo',
+        'Paulo Afonso', 'Longford', 'Saint-Lô'
+    ])
+]
+
+def __names(found):
+    return [i['name'] for i in found]
+
+# --------------------------
+
+def test_search():
+    index = cities.CityIndex(CITIES)
+
+    # Exact, then prefix, then word prefix, then the rest
+    assert __names(index.search('london')) == ['London', 'Londonderry', 'East London', 'New  London']
+    assert __names(index.search('  LONDON ', 2)) == ['London', 'Londonderry']
+    assert __names(index.search('ndo')) == ['East London', 'London', 'Londonderry', 'New  London', 'Ondo']
+    assert __names(index.search('lo')) == [
+        'Lo', 'London', 'Londonderry', 'Longford', 'East London', 'New  London', 'Saint-Lô',
+        'Paulo Afonso', 'São Paulo'
+    ]
+
+    # Case, accents and whitespace
+    assert __names(index.search('sao paulo')) == ['São Paulo']
+    assert __names(index.search('new london')) == ['New  London']
+    assert __names(index.search('lo', 3)) == ['Lo', 'London', 'Londonderry']
+    assert __names(index.search('o', 4)) == ['Ondo', 'East London', 'Lo', 'London']
+    assert __names(index.search('nd')) == ['East London', 'London', 'Londonderry', 'New  London', 'Ondo']
+    assert __names(index.search('saint-lo')) == ['Saint-Lô']
+
+    assert index.search('zzz') == []
+    assert index.search(' ') == []
+
+def test_autocomplete():
+    index = cities.CityIndex(CITIES)
+
+    assert __names(index.autocomplete('Lon')) == ['London', 'Londonderry', 'Longford']
+    assert __names(index.autocomplete('lon', 1)) == ['London']
+    assert index.autocomplete('') == []
+
+def test_client():
+    index = cities.CityIndex(CITIES)
+    c = client.Client('token', city_index=index)
+
+    assert c.cities is CITIES
+    assert c.find_city('paulo') == [CITIES[7], CITIES[0]]
+    assert c.find_city('paulo', 1) == [CITIES[7]]
+
+    # Assigning cities indexes them, for this client only
+    c.cities = CITIES[:3]
+    c.cities += [CITIES[7]]
+
+    assert c.find_city('paulo') == [CITIES[7], CITIES[0]]
+    assert c.find_city('londonderry') == [CITIES[1]]
+    assert c.find_city('longford') == []
+    assert index.search('longford') == [CITIES[8]]
+
+# --------------------------
+
+if __name__ == '__main__':
+    test_search()
+    test_autocomplete()
+    test_client()
@@ -0,0 +1,337 @@
+import asyncio
+import shutil
+import threading
+import time
+
+from benchmarks.server import ReplayServer
+
+from speck import AsyncClient, Client, RateLimiter, cache, compression, errors, serializers, types
+
+# Utils --------------------
+
+def __client(server, **kwargs):
+    c = Client('test', **kwargs)
+    c.BASE = server.url
+    return c
+
+def __concurrently(func, count):
+    """Call ``func`` on ``count`` threads at once, and get what each returned or raised."""
+
+    barrier = threading.Barrier(count)
+    results = [None] * count
+
+    def call(i):
+        barrier.wait()
+        try:
+            results[i] = func()
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(count)]
+    for i in threads:
+        i.start()
+    for i in threads:
+        i.join()
+
+    return results
+
+# --------------------------
+
+def test_async_client():
+    async def main(server):
+        async with AsyncClient('test', use_cache=True, cache_file='sqlite', cache_path='.test-client-cache') as c:
+            c.client.BASE = server.url
+
+            # Requests run concurrently
+            start = time.perf_counter()
+            (current, forecast, invalid) = await asyncio.gather(
+                c.current('london'), c.forecast('paris'), c.current('invalid-1'),
+                return_exceptions=True
+            )
+
+            assert time.perf_counter() - start < 0.4
+            assert isinstance(current, types.HourlyPoint)
+            assert isinstance(forecast[0], types.HourlyPoint) and len(forecast[1]) == 3
+            assert isinstance(invalid, errors.InvalidLocation)
+
+            server.error_rate = 1
+            try:
+                await c.astronomy('berlin')
+            except errors.InternalError:
+                pass
+            else:
+                assert False
+
+            return c
+
+    with ReplayServer(latency=0.2) as server:
+        try:
+            client = asyncio.run(main(server))
+
+            # Closing the client wrote its pending cache and closed its cache manager too
+            manager = cache.SqliteCacheManager('.test-client-cache')
+            assert manager.read('current-london') is not None
+            manager.close()
+
+            assert not client.cache._finalizer.alive
+        finally:
+            shutil.rmtree('.test-client-cache', ignore_errors=True)
+
+def test_current_many():
+    with ReplayServer() as server:
+        c = __client(server, max_workers=4)
+        locs = ['london', 'invalid-1', 'paris', 'invalid-2', 'berlin']
+
+        # Input order, with errors in place of their results
+        results = c.current_many(locs)
+
+        assert len(results) == len(locs)
+        for (loc, result) in zip(locs, results):
+            if loc.startswith('invalid'):
+                assert isinstance(result, errors.InvalidLocation)
+            else:
+                assert isinstance(result, types.HourlyPoint)
+
+        # Completion order, along with their locations
+        results = dict(c.current_many(locs, workers=2, ordered=False))
+
+        assert sorted(results) == sorted(locs)
+        assert isinstance(results['invalid-2'], errors.InvalidLocation)
+        assert isinstance(results['paris'], types.HourlyPoint)
+
+        assert c.current_many([]) == []
+
+def test_single_flight():
+    with ReplayServer(latency=0.2) as server:
+        c = __client(server)
+
+        # Every thread gets the leader's response
+        results = __concurrently(lambda: c.forecast('london'), 8)
+
+        assert server.requests == 1
+        assert all(isinstance(i, tuple) for i in results)
+
+        # And the leader's error
+        server.error_rate = 1
+        results = __concurrently(lambda: c.forecast('london'), 8)
+
+        assert server.requests == 2
+        assert all(isinstance(i, errors.InternalError) for i in results)
+
+def test_request_types():
+    c = Client('test', timeouts={'astronomy': 1, 'forecast': 2}, ttl={'ip': 60, 'search': 30})
+
+    assert c.timeouts == {'astro': 1, 'forecast': 2}
+    assert c.ttl['iplookup'] == 60 and c.ttl['search'] == 30
+    assert set(c.ttl) <= set(Client.TYPES)
+
+def test_rate_limiter():
+    with ReplayServer() as server:
+        # Not blocking
+        c = __client(server, limiter=RateLimiter(per_second=1, burst=1, block=False))
+        c.current('london')
+
+        try:
+            c.current('london')
+        except errors.RateLimited:
+            pass
+        else:
+            assert False
+
+        # Outdated cache rather than nothing, when rate limited
+        limiter = RateLimiter(per_second=1, burst=1, block=False)
+        c = __client(server, use_cache=True, ttl={'current': -1}, limiter=limiter)
+        c.current('london')
+
+        assert isinstance(c.current('london'), types.HourlyPoint)
+        assert c.cache_stats()['stale'] == 1
+
+        # Or when running out of requests for the month
+        c = __client(server, use_cache=True, ttl={'current': -1}, limiter=RateLimiter(per_month=100, used=95))
+        c.current('london')
+        requests = server.requests
+
+        assert isinstance(c.current('london'), types.HourlyPoint)
+        assert server.requests == requests
+        assert c.cache_stats()['stale'] == 1
+
+        # weatherapi's own quota
+        limiter = RateLimiter(per_month=100)
+        c = __client(server, limiter=limiter)
+        server.error_rate = 1
+        server.error_kind = 'quota'
+
+        try:
+            c.current('london')
+        except errors.QuotaExceeded:
+            pass
+        else:
+            assert False
+
+        assert limiter.remaining() == 0
+
+def test_async_limiter():
+    async def main(server):
+        limiter = RateLimiter(per_second=1, burst=2, block=False)
+
+        async with AsyncClient('test', concurrency=4, limiter=limiter, observers=[]) as c:
+            c.client.BASE = server.url
+            return await asyncio.gather(*(c.current(i) for i in ('london', 'paris', 'berlin')), return_exceptions=True)
+
+    with ReplayServer() as server:
+        results = asyncio.run(main(server))
+
+        assert sum(isinstance(i, types.HourlyPoint) for i in results) == 2
+        assert sum(isinstance(i, errors.RateLimited) for i in results) == 1
+
+def test_stale_while_revalidate():
+    with ReplayServer(latency=0.2) as server:
+        c = __client(server, use_cache=True, ttl={'forecast': -1}, stale_while_revalidate=True)
+        c.forecast('london')
+        (expires_at, _) = c.cache.read_entry('forecast-london-3')
+
+        # Outdated cache is returned right away
+        start = time.perf_counter()
+        assert isinstance(c.forecast('london'), tuple)
+        assert time.perf_counter() - start < 0.1
+        assert c.cache_stats()['stale'] == 1
+
+        # And updated in the background
+        while c.cache_stats()['dumps'] < 2:
+            time.sleep(0.01)
+
+        assert server.requests == 2
+        assert c.cache.read_entry('forecast-london-3')[0] > expires_at
+
+        # Failed updates don't reach the thread running them
+        failed = []
+        hook = threading.excepthook
+        threading.excepthook = failed.append
+        server.error_rate = 1
+
+        try:
+            c.forecast('london')
+            time.sleep(0.4) # Until the update has failed
+        finally:
+            threading.excepthook = hook
+            server.error_rate = 0
+
+        assert failed == []
+
+        # Cache outdated for longer than `max_stale` is requested again
+        c.max_stale = 0
+        start = time.perf_counter()
+        c.forecast('london')
+
+        assert time.perf_counter() - start >= 0.2
+        assert server.requests == 4
+
+def test_legacy_cache():
+    with ReplayServer() as server:
+        c = __client(server, use_cache=True, cache_file=True, cache_path='.test-client-cache')
+
+        try:
+            c.cache.dump('forecast-london-now-2021-04-16-17-4', 'old')
+            c.cache.dump('current-london-now-2021-04-16-17-4', 'old')
+
+            c.forecast('london')
+
+            assert sorted(c.cache.find_all()) == ['current-london-now-2021-04-16-17-4', 'forecast-london-3']
+        finally:
+            shutil.rmtree('.test-client-cache', ignore_errors=True)
+
+def test_cache_file():
+    managers = {
+        True: cache.FileCacheManager,
+        'file': cache.FileCacheManager,
+        'sqlite': cache.SqliteCacheManager,
+        'mmap': cache.MmapCacheManager,
+        'tiered': cache.TieredCacheManager
+    }
+
+    try:
+        for (cache_file, manager) in managers.items():
+            c = Client('test', use_cache=True, cache_file=cache_file, cache_path='.test-client-cache')
+            assert type(c.cache) is manager
+            c.cache.close()
+    finally:
+        shutil.rmtree('.test-client-cache', ignore_errors=True)
+
+    try:
+        Client('test', use_cache=True, cache_file='sqllite')
+    except ValueError:
+        pass
+    else:
+        assert False
+
+def test_cache_serializer():
+    with ReplayServer() as server:
+        for (serializer, cache_raw) in ((serializers.PackedSerializer(), False), (serializers.RawSerializer(), True)):
+            c = __client(server, use_cache=True, cache_file='sqlite', cache_path='.test-client-cache',
+                         serializer=serializer, cache_raw=cache_raw)
+
+            try:
+                c.forecast('london')
+                (current, days) = c.forecast('london')
+
+                assert server.requests == 1
+                assert isinstance(current, types.HourlyPoint) and len(days) == 3
+            finally:
+                c.cache.close()
+                shutil.rmtree('.test-client-cache', ignore_errors=True)
+                server.requests = 0
+
+    for (serializer, cache_raw) in ((serializers.JsonSerializer(), False), (serializers.JsonSerializer(), True)):
+        try:
+            Client('test', use_cache=True, serializer=serializer, cache_raw=cache_raw)
+        except ValueError:
+            pass
+        else:
+            assert False
+
+def test_cache_codec():
+    with ReplayServer() as server:
+        c = __client(server, use_cache=True, cache_file='tiered', cache_path='.test-client-cache',
+                     codec='lzma', compress_threshold=0)
+
+        try:
+            c.forecast('london')
+            c.cache.flush()
+
+            assert isinstance(c.cache.back.codec, compression.LzmaCodec)
+            assert c.cache.back.debug_size() < len(c.cache.back.serializer.dumps(c.forecast('london')))
+        finally:
+            c.cache.close()
+            shutil.rmtree('.test-client-cache', ignore_errors=True)
+
+def test_cache_stats():
+    with ReplayServer() as server:
+        c = __client(server, use_cache=True)
+        c.forecast('london')
+        c.forecast('london')
+
+        stats = c.cache_stats()
+        assert (stats['hits'], stats['misses'], stats['hit_rate']) == (1, 1, 0.5)
+
+        # Nothing is encoded without cache
+        c = __client(server)
+        c.cache.serializer = None
+        c.forecast('london')
+
+        assert c.cache_stats()['dumps'] == 0
+
+# --------------------------
+
+if __name__ == '__main__':
+    test_async_client()
+    test_current_many()
+    test_single_flight()
+    test_request_types()
+    test_rate_limiter()
+    test_async_limiter()
+    test_stale_while_revalidate()
+    test_legacy_cache()
+    test_cache_file()
+    test_cache_serializer()
+    test_cache_codec()
+    test_cache_stats()
@@ -0,0 +1,79 @@
+import pytest
+
+from speck import client, types
+
+np = pytest.importorskip('numpy')
+
+# Utils --------------------
+
+def __response():
+    hour = lambda day, h: {
+        'time': f'2021-04-{day} {h:02d}:00', 'temp_c': h / 2, 'feelslike_c': 8.0,
+        'condition': {'text': 'Sunny', 'code': 1000}, 'wind_kph': 15.1, 'wind_degree': 60,
+        'wind_dir': 'ENE', 'gust_kph': 20.0, 'pressure_mb': 1026.0, 'precip_mm': 0.0,
+        'humidity': 47, 'cloud': 0, 'is_day': int(6 <= h < 20), 'uv': 4.0, 'vis_km': 10.0,
+        'chance_of_rain': '12'
+    }
+    day = {
+        'maxtemp_c': 14.2, 'mintemp_c': 3.1, 'avgtemp_c': 8.9, 'maxwind_kph': 18.4,
+        'totalprecip_mm': 0.0, 'avgvis_km': 10.0, 'avghumidity': 58.0,
+        'condition': {'text': 'Sunny', 'code': 1000}, 'uv': 4.0
+    }
+    location = {
+        'name': 'London', 'region': 'City of London, Greater London', 'country': 'United Kingdom',
+        'lat': 51.52, 'lon': -0.11, 'tz_id': 'Europe/London', 'localtime': '2021-04-16 18:00'
+    }
+
+    return {
+        'location': location,
+        'current': dict(hour(16, 17), last_updated='2021-04-16 17:45'),
+        'forecast': {'forecastday': [
+            {'date': f'2021-04-{d}', 'day': day, 'astro': {}, 'hour': [hour(d, h) for h in range(24)]}
+            for d in (16, 17)
+        ]}
+    }
+
+# --------------------------
+
+def test_hour_columns():
+    response = __response()
+    columns = types.hour_columns(response)
+
+    assert columns['temp_c'].shape == (48,)
+    assert columns['temp_c'].dtype == np.float64
+    assert columns['temp_c'].flags['C_CONTIGUOUS']
+    assert columns['temp_c'][5] == 2.5
+    assert columns['chance_of_rain'][0] == 12.0
+    assert np.isnan(columns['windchill_c']).all() # Missing
+    assert columns['is_day'].sum() == 28
+    assert columns['time'][0] == np.datetime64('2021-04-16T00:00')
+    assert columns['time'][-1] == np.datetime64('2021-04-17T23:00')
+
+    # The same from points, built or not
+    for lazy in (False, True):
+        (_, days) = client._parse_forecast(response, lazy)
+        days[0].hour[3].temp_c # Build one of them
+
+        from_points = types.hour_columns(days)
+        for (name, column) in columns.items():
+            assert np.array_equal(column, from_points[name], equal_nan=name != 'time')
+
+        assert np.array_equal(days[1].hour_columns()['temp_c'], columns['temp_c'][24:])
+
+    # Lazy points given their fields as positional arguments
+    location = types.Location.from_raw(response['location'])
+    hour = types.HourlyPoint.lazy(
+        location, 5.0, 8.0, {'text': 'Sunny', 'code': 1000}, 15.1, 60, 'ENE', 20.0,
+        1026.0, 0.0, 47, 0, 1, 4.0, time='2021-04-16 03:00'
+    )
+    day = types.DailyPoint(location, response['forecast']['forecastday'][0]['day'], {}, [hour])
+
+    columns = types.hour_columns([day])
+    assert columns['temp_c'][0] == 5.0
+    assert columns['humidity'][0] == 47
+    assert columns['time'][0] == np.datetime64('2021-04-16T03:00')
+
+# --------------------------
+
+if __name__ == '__main__':
+    test_hour_columns()
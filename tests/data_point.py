@@ -0,0 +1,128 @@
+import dataclasses
+import pickle
+
+from datetime import datetime as dt
+
+from speck import types
+from speck.types import data_point
+
+# Utils --------------------
+
+LOCATION = {
+    'name': 'London', 'region': 'City of London, Greater London', 'country': 'United Kingdom',
+    'lat': 51.52, 'lon': -0.11, 'tz_id': 'Europe/London', 'localtime': '2021-04-16 18:00'
+}
+
+def __hour(hour):
+    return {
+        'time': f'2021-04-16 {hour:02d}:00', 'temp_c': 10.0 + hour, 'feelslike_c': 8.0,
+        'condition': {'text': 'Sunny', 'code': 1000}, 'wind_kph': 15.1, 'wind_degree': 60,
+        'wind_dir': 'ENE', 'gust_kph': 20.0, 'pressure_mb': 1026.0, 'precip_mm': 0.0,
+        'humidity': 47, 'cloud': 0, 'is_day': 1, 'uv': 4.0, 'vis_km': 10.0
+    }
+
+DAY = {
+    'maxtemp_c': 14.2, 'mintemp_c': 3.1, 'avgtemp_c': 8.9, 'maxwind_kph': 18.4,
+    'totalprecip_mm': 0.0, 'avgvis_km': 10.0, 'avghumidity': 58.0,
+    'condition': {'text': 'Sunny', 'code': 1000}, 'uv': 4.0
+}
+
+def __daily(lazy=False):
+    return types.DailyPoint(LOCATION, DAY, {'sunrise': '05:59 AM'}, [__hour(i) for i in range(24)], lazy)
+
+def __state(point):
+    """Everything in a point, for comparisons."""
+
+    if isinstance(point, list):
+        return [__state(i) for i in point]
+    if isinstance(point, (types.Km, types.Mm, types.Mb, types.Cel)):
+        return point.val
+    if hasattr(point, '__getstate__') and isinstance(point.__getstate__(), dict):
+        return {k: __state(v) for (k, v) in point.__getstate__().items()}
+    return point
+
+# --------------------------
+
+def test_lazy():
+    eager = __daily()
+    lazy = __daily(lazy=True)
+
+    assert '_lazy' in lazy.hour[5].__getstate__()
+    assert lazy.hour[5].temp_c.val == 15.0
+    assert '_lazy' not in lazy.hour[5].__getstate__()
+    assert '_lazy' in lazy.hour[6].__getstate__() # Only what is used is built
+
+    assert lazy.day.maxtemp_c.val == 14.2
+    assert [i.time for i in lazy.hour] == [i.time for i in eager.hour]
+    assert __state(lazy.hour) == __state(eager.hour)
+
+    # Unbuilt points stay lazy through pickling
+    point = pickle.loads(pickle.dumps(__daily(lazy=True).hour[3]))
+    assert '_lazy' in point.__getstate__()
+    assert point.time.hour == 3
+
+    try:
+        point.not_an_attribute
+    except AttributeError:
+        pass
+    else:
+        assert False
+
+def test_shared_location():
+    daily = __daily()
+    locations = {id(daily.location), id(daily.day.location)} | {id(i.location) for i in daily.hour}
+
+    assert len(locations) == 1
+    assert __daily().location is daily.location # Interned
+
+    other = types.Location.from_raw(dict(LOCATION, localtime='2021-04-16 19:00'))
+    assert other is not daily.location
+    assert other.localtime.hour == 19
+
+    # Sharing survives pickling
+    daily = pickle.loads(pickle.dumps(daily))
+    assert daily.hour[0].location is daily.hour[1].location is daily.location
+
+def test_slots():
+    daily = __daily()
+
+    for i in (daily, daily.location, daily.day, daily.hour[0], daily.hour[0].temp_c):
+        assert not hasattr(i, '__dict__')
+
+    assert types.Cel(3.5) == types.Cel(3.5)
+    assert types.Cel(3.5) != types.Km(3.5)
+    assert repr(types.Cel()) == '-273.15'
+
+    # Units are still dataclasses
+    assert dataclasses.asdict(types.Km(2)) == {'val': 2}
+    assert dataclasses.replace(types.Cel(3.5), val=4) == types.Cel(4)
+
+    # Pickles from before slots were added hold a plain `__dict__`
+    hour = types.HourlyPoint.__new__(types.HourlyPoint)
+    hour.__setstate__(dict(daily.hour[4].__getstate__(), removed_attribute=1))
+    assert __state(hour) == __state(daily.hour[4])
+
+    copy = pickle.loads(pickle.dumps(daily))
+    assert __state(copy) == __state(daily)
+
+def test_parse_time():
+    for text in ('2021-04-16 17:45', '2021-4-1 9:05', '2021-04-16 7:45', '2020-02-29 00:00'):
+        assert data_point._parse_time(text) == dt.strptime(text, "%Y-%m-%d %H:%M")
+
+    assert data_point._parse_time('2021-04-16 17:45') is data_point._parse_time('2021-04-16 17:45')
+
+    for text in ('2021-04-16T17:45', '2021-04-16 17:45:00', '2021-02-30 10:00', '2021-04-16 24:00', ''):
+        try:
+            data_point._parse_time(text)
+        except ValueError:
+            pass
+        else:
+            assert False, text
+
+# --------------------------
+
+if __name__ == '__main__':
+    test_lazy()
+    test_shared_location()
+    test_slots()
+    test_parse_time()
@@ -0,0 +1,93 @@
+import json
+import random
+
+import pytest
+
+from benchmarks.server import ReplayServer
+
+from speck import Client, decoding, types
+
+# Utils --------------------
+
+RESPONSE = {
+    'location': {'name': 'a "[{quoted}]" \\ name', 'key': '"forecastday": ['},
+    'current': {'temp_c': 12.0},
+    'forecast': {'forecastday': [
+        {'date': '2021-04-16', 'day': {'text': '}]", {['}, 'hour': [{'temp_c': 9.5}, {'temp_c': 10.25}]},
+        {'date': '2021-04-17', 'day': {}, 'hour': [[1, [2]], {}]}
+    ]},
+    'alerts': {}
+}
+
+def __chunks(data, size):
+    return (data[i:i + size] for i in range(0, len(data), size))
+
+# --------------------------
+
+def test_backends():
+    data = json.dumps(RESPONSE).encode()
+
+    assert isinstance(decoding.get_backend(None), decoding.StdlibBackend)
+    assert isinstance(decoding.get_backend('auto'), decoding.JsonBackend)
+
+    for name in ('json', 'orjson', 'ujson'):
+        try:
+            backend = decoding.get_backend(name)
+        except ImportError:
+            continue
+
+        assert backend.loads(data) == RESPONSE
+
+    try:
+        decoding.get_backend('yaml')
+    except ValueError:
+        pass
+    else:
+        assert False
+
+def test_ujson():
+    pytest.importorskip('ujson')
+    backend = decoding.get_backend('ujson')
+
+    # Floats are parsed like `json` does, whichever version is installed
+    r = random.Random(0)
+    floats = [r.uniform(-1000, 1000) for _ in range(1000)] + [round(r.uniform(-100, 100), 2) for _ in range(1000)]
+    data = json.dumps(floats).encode()
+
+    assert backend.loads(data) == json.loads(data)
+    assert backend.loads(json.dumps(RESPONSE).encode()) == RESPONSE
+
+    with ReplayServer() as server:
+        c = Client('test', json_backend=backend)
+        c.BASE = server.url
+
+        (current, days) = c.forecast('london')
+        assert isinstance(current, types.HourlyPoint) and len(days) == 3
+
+def test_iter_forecast():
+    data = json.dumps(RESPONSE).encode()
+
+    for size in (1, 3, 64, len(data)):
+        (head, *days) = decoding.iter_forecast(__chunks(data, size))
+
+        assert head['location'] == RESPONSE['location']
+        assert head['current'] == RESPONSE['current']
+        assert days == RESPONSE['forecast']['forecastday']
+
+    # Anything else is decoded whole
+    error = {'error': {'code': 1006, 'message': 'No matching location found.'}}
+    assert list(decoding.iter_forecast(__chunks(json.dumps(error).encode(), 5))) == [error]
+
+    try:
+        list(decoding.iter_forecast([data[:len(data) // 2]]))
+    except ValueError:
+        pass
+    else:
+        assert False
+
+# --------------------------
+
+if __name__ == '__main__':
+    test_backends()
+    test_ujson()
+    test_iter_forecast()
@@ -0,0 +1,51 @@
+from speck.errors import InvalidLocation
+from speck.hooks import PrometheusObserver, RequestEvent
+
+# Utils --------------------
+
+def __event(cache, status=None, error=None):
+    event = RequestEvent('current', 'current-london', cache)
+    event.status = status
+    event.error = error
+    event.duration = 0.02
+
+    if status is not None:
+        event.bytes = 100
+        event.timings = {'dns': 0.0, 'connect': 0.0, 'ttfb': 0.01, 'total': 0.015}
+
+    return event
+
+# --------------------------
+
+def test_prometheus():
+    observer = PrometheusObserver()
+
+    observer.request_finished(__event('miss', 200))
+    observer.request_finished(__event('hit'))
+    observer.request_finished(__event('miss', 400, InvalidLocation))
+
+    text = observer.render().splitlines()
+
+    assert 'speck_requests_total{endpoint="current",cache="miss"} 2' in text
+    assert 'speck_requests_total{endpoint="current",cache="hit"} 1' in text
+    assert 'speck_errors_total{endpoint="current",error="InvalidLocation"} 1' in text
+    assert 'speck_http_responses_total{endpoint="current",status="400"} 1' in text
+    assert 'speck_http_response_bytes_total{endpoint="current"} 200' in text
+
+    # Buckets are cumulative
+    assert 'speck_request_duration_seconds_bucket{endpoint="current",le="0.01"} 0' in text
+    assert 'speck_request_duration_seconds_bucket{endpoint="current",le="0.025"} 3' in text
+    assert 'speck_request_duration_seconds_bucket{endpoint="current",le="+Inf"} 3' in text
+    assert 'speck_request_duration_seconds_count{endpoint="current"} 3' in text
+    assert 'speck_http_duration_seconds_count{endpoint="current",phase="ttfb"} 2' in text
+
+    # Requests which failed before using cache
+    observer.request_finished(__event(None, error=OSError))
+
+    text = observer.render().splitlines()
+    assert 'speck_requests_total{endpoint="current",cache="error"} 1' in text
+
+# --------------------------
+
+if __name__ == '__main__':
+    test_prometheus()